@@ -31,17 +31,33 @@ from __future__ import annotations
 
 from .config import SessionConfig
 from .constants import (
+    ACQUIRE_AND_LOAD_SCRIPT,
+    ACQUIRE_AND_LOAD_SHA,
     DEFAULT_JSON_FIELDS,
     DEFAULT_LOCK_TIMEOUT,
     DEFAULT_SESSION_EXPIRE,
+    LOCK_RELEASE_CHANNEL_SUFFIX,
     LOCK_RETRY_INTERVAL,
+    LOCK_RETRY_MAX_INTERVAL,
     LOCK_SUFFIX,
+    PHPSESSID_MAX_LENGTH,
+    PHPSESSID_MIN_LENGTH,
     PHPSESSID_PATTERN,
     RELEASE_LOCK_SCRIPT,
+    RELEASE_LOCK_SHA,
+    SAVE_AND_RELEASE_SCRIPT,
+    SAVE_AND_RELEASE_SHA,
     SESSION_PREFIX,
+    SET_KEY_SCRIPT,
+    SET_KEY_SHA,
 )
-from .context import get_current_session_id, set_current_session_id
-from .decode import decode_json_fields
+from .context import (
+    bind_session_id,
+    get_current_session_id,
+    reset_current_session_id,
+    set_current_session_id,
+)
+from .decode import decode_json_fields, encode_json_fields, make_json_field_decoder
 from .exceptions import (
     SessionContextError,
     SessionError,
@@ -49,7 +65,9 @@ from .exceptions import (
     SessionNotFoundError,
 )
 from .manager import SessionManager
+from .runtime import run_with_uvloop
 from .sanitize import sanitize_phpsessid
+from .serializer import MsgPackSerializer, PHPSerializer, Serializer, ZstdSerializer
 
 __version__ = "0.1.0"
 
@@ -57,6 +75,11 @@ __all__ = [
     # Main classes
     "SessionManager",
     "SessionConfig",
+    # Serializers
+    "Serializer",
+    "PHPSerializer",
+    "MsgPackSerializer",
+    "ZstdSerializer",
     # Exceptions
     "SessionError",
     "SessionLockError",
@@ -64,17 +87,33 @@ __all__ = [
     "SessionContextError",
     # Context helpers
     "set_current_session_id",
+    "reset_current_session_id",
+    "bind_session_id",
     "get_current_session_id",
     # Utility functions
     "sanitize_phpsessid",
     "decode_json_fields",
+    "encode_json_fields",
+    "make_json_field_decoder",
+    "run_with_uvloop",
     # Constants
     "SESSION_PREFIX",
     "LOCK_SUFFIX",
+    "LOCK_RELEASE_CHANNEL_SUFFIX",
     "DEFAULT_JSON_FIELDS",
     "DEFAULT_SESSION_EXPIRE",
     "DEFAULT_LOCK_TIMEOUT",
     "LOCK_RETRY_INTERVAL",
+    "LOCK_RETRY_MAX_INTERVAL",
     "RELEASE_LOCK_SCRIPT",
+    "RELEASE_LOCK_SHA",
+    "SAVE_AND_RELEASE_SCRIPT",
+    "SAVE_AND_RELEASE_SHA",
+    "SET_KEY_SCRIPT",
+    "SET_KEY_SHA",
+    "ACQUIRE_AND_LOAD_SCRIPT",
+    "ACQUIRE_AND_LOAD_SHA",
     "PHPSESSID_PATTERN",
+    "PHPSESSID_MIN_LENGTH",
+    "PHPSESSID_MAX_LENGTH",
 ]
@@ -0,0 +1,331 @@
+"""Fast PHP (un)serializer for session payloads.
+
+phpserialize reads its input one byte at a time through a file-like
+object. Session payloads are already complete ``bytes`` objects, so this
+module parses them with ``bytes.index`` and slicing instead, which keeps
+the per-token work in C.
+
+Output matches ``phpserialize.loads(raw, decode_strings=True,
+object_hook=lambda _name, d: dict(d))``: PHP arrays and objects both
+become dicts.
+
+``loads_item`` reads one entry of a serialized array, skipping over the
+others without building them.
+
+``dumps`` produces the same bytes as ``phpserialize.dumps``, but appends
+every token to one list that is joined once, instead of building each
+string in a BytesIO and joining every nested array separately.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import phpserialize
+
+# Type tags as byte values (indexing bytes yields ints)
+_NULL = ord("N")
+_BOOL = ord("b")
+_INT = ord("i")
+_FLOAT = ord("d")
+_STRING = ord("s")
+_ARRAY = ord("a")
+_OBJECT = ord("O")
+_QUOTE = ord('"')
+_OPEN_BRACE = ord("{")
+_CLOSE_BRACE = ord("}")
+_SEMICOLON = ord(";")
+
+
+def loads(data: bytes, decode_strings: bool = True) -> Any:
+    """Unserialize a PHP-serialized value.
+
+    Args:
+        data: PHP-serialized bytes.
+        decode_strings: Decode PHP strings to ``str`` (UTF-8) instead of
+                       returning ``bytes``.
+
+    Returns:
+        The unserialized value. Arrays and objects become dicts.
+
+    Raises:
+        ValueError: If the data is not valid PHP-serialized data.
+    """
+    try:
+        value, _ = _load(data, 0, decode_strings)
+    except IndexError:
+        raise ValueError("unexpected end of stream") from None
+    return value
+
+
+def _load(data: bytes, pos: int, decode_strings: bool) -> tuple[Any, int]:
+    """Parse the value starting at ``pos``; return it and the next offset."""
+    tag = data[pos]
+
+    if tag == _STRING:
+        colon = data.index(b":", pos + 2)
+        start = colon + 2
+        end = start + int(data[pos + 2 : colon])
+        if data[colon + 1] != _QUOTE or data[end : end + 2] != b'";':
+            raise ValueError(f"malformed string at offset {pos}")
+        raw = data[start:end]
+        return (raw.decode() if decode_strings else raw), end + 2
+
+    if tag == _INT:
+        end = data.index(b";", pos + 2)
+        return int(data[pos + 2 : end]), end + 1
+
+    if tag == _ARRAY:
+        return _load_array(data, pos + 2, decode_strings)
+
+    if tag == _NULL:
+        if data[pos + 1] != _SEMICOLON:
+            raise ValueError(f"malformed null at offset {pos}")
+        return None, pos + 2
+
+    if tag == _BOOL:
+        end = data.index(b";", pos + 2)
+        return int(data[pos + 2 : end]) != 0, end + 1
+
+    if tag == _FLOAT:
+        end = data.index(b";", pos + 2)
+        return float(data[pos + 2 : end]), end + 1
+
+    if tag == _OBJECT:
+        # O:<len>:"<class name>":<count>:{...}; the class name is dropped
+        colon = data.index(b":", pos + 2)
+        end = colon + 2 + int(data[pos + 2 : colon])
+        if data[colon + 1] != _QUOTE or data[end : end + 2] != b'":':
+            raise ValueError(f"malformed object at offset {pos}")
+        return _load_array(data, end + 2, decode_strings)
+
+    raise ValueError(f"unexpected opcode {chr(tag)!r} at offset {pos}")
+
+
+def _load_array(data: bytes, pos: int, decode_strings: bool) -> tuple[Any, int]:
+    """Parse ``<count>:{<key><value>...}`` starting at ``pos``."""
+    colon = data.index(b":", pos)
+    count = int(data[pos:colon])
+    if data[colon + 1] != _OPEN_BRACE:
+        raise ValueError(f"malformed array at offset {pos}")
+    pos = colon + 2
+
+    result: dict[Any, Any] = {}
+    for _ in range(count):
+        key, pos = _load(data, pos, decode_strings)
+        result[key], pos = _load(data, pos, decode_strings)
+
+    if data[pos] != _CLOSE_BRACE:
+        raise ValueError(f"malformed array at offset {pos}")
+    return result, pos + 1
+
+
+def loads_item(data: bytes, key: Any, decode_strings: bool = True) -> Any:
+    """Unserialize a single entry of a PHP-serialized array.
+
+    Entries before the requested one are skipped without being built or
+    decoded, and parsing stops as soon as the key is found.
+
+    Args:
+        data: PHP-serialized bytes of an array.
+        key: Array key to look up (matched as PHP serializes it).
+        decode_strings: Decode PHP strings to ``str`` (UTF-8) instead of
+                       returning ``bytes``.
+
+    Returns:
+        The unserialized value, or None if the key is not present.
+
+    Raises:
+        ValueError: If the data is not a valid PHP-serialized array.
+    """
+    if data[:2] != b"a:":
+        raise ValueError("not a PHP-serialized array")
+    wanted = dumps_key(key)
+    try:
+        colon = data.index(b":", 2)
+        count = int(data[2:colon])
+        if data[colon + 1] != _OPEN_BRACE:
+            raise ValueError("malformed array at offset 2")
+        pos = colon + 2
+        for _ in range(count):
+            value_pos = _skip(data, pos)
+            if data[pos:value_pos] == wanted:
+                return _load(data, value_pos, decode_strings)[0]
+            pos = _skip(data, value_pos)
+    except IndexError:
+        raise ValueError("unexpected end of stream") from None
+    if data[pos:] != b"}":
+        raise ValueError(f"malformed array at offset {pos}")
+    return None
+
+
+def _skip(data: bytes, pos: int) -> int:
+    """Return the offset just past the value starting at ``pos``."""
+    tag = data[pos]
+
+    if tag == _STRING:
+        colon = data.index(b":", pos + 2)
+        end = colon + 2 + int(data[pos + 2 : colon])
+        if data[colon + 1] != _QUOTE or data[end : end + 2] != b'";':
+            raise ValueError(f"malformed string at offset {pos}")
+        return end + 2
+
+    if tag in (_INT, _BOOL, _FLOAT):
+        return data.index(b";", pos + 2) + 1
+
+    if tag == _NULL:
+        return pos + 2
+
+    if tag == _ARRAY:
+        pos += 2
+    elif tag == _OBJECT:
+        colon = data.index(b":", pos + 2)
+        end = colon + 2 + int(data[pos + 2 : colon])
+        if data[colon + 1] != _QUOTE or data[end : end + 2] != b'":':
+            raise ValueError(f"malformed object at offset {pos}")
+        pos = end + 2
+    else:
+        raise ValueError(f"unexpected opcode {chr(tag)!r} at offset {pos}")
+
+    colon = data.index(b":", pos)
+    count = int(data[pos:colon])
+    if data[colon + 1] != _OPEN_BRACE:
+        raise ValueError(f"malformed array at offset {pos}")
+    pos = colon + 2
+    for _ in range(2 * count):
+        pos = _skip(data, pos)
+    if data[pos] != _CLOSE_BRACE:
+        raise ValueError(f"malformed array at offset {pos}")
+    return pos + 1
+
+
+def dumps(data: Any) -> bytes:
+    """Serialize a value to PHP-serialized bytes.
+
+    Args:
+        data: None, bool, int, float, str, bytes, or a dict, list or tuple
+              of those. Other types are handed to ``phpserialize.dumps``.
+
+    Returns:
+        PHP-serialized bytes, identical to ``phpserialize.dumps(data)``.
+
+    Raises:
+        TypeError: If the data contains a type PHP cannot represent.
+    """
+    out: list[bytes] = []
+    _dump(data, out)
+    return b"".join(out)
+
+
+def dumps_key(key: Any) -> bytes:
+    """Serialize a value as a PHP array key.
+
+    Args:
+        key: int, str, bytes, bool, float or None, converted like PHP
+             converts array keys.
+
+    Returns:
+        The key's PHP-serialized bytes, as they appear inside an array.
+
+    Raises:
+        TypeError: If the key is of another type.
+    """
+    out: list[bytes] = []
+    _dump_key(key, out)
+    return b"".join(out)
+
+
+def _dump(obj: Any, out: list[bytes]) -> None:
+    """Append the serialized tokens of ``obj`` to ``out``."""
+    # Dispatch on the exact type, most common session types first; an
+    # identity check is cheaper than isinstance(). Subclasses (IntEnum,
+    # OrderedDict, ...) take the isinstance() path in _dump_other().
+    kind = type(obj)
+    if kind is str:
+        encoded = obj.encode()
+        out.append(b's:%d:"' % len(encoded))
+        out.append(encoded)
+        out.append(b'";')
+    elif kind is int:
+        out.append(b"i:%d;" % obj)
+    elif kind is dict:
+        append = out.append
+        append(b"a:%d:{" % len(obj))
+        for key, value in obj.items():
+            if type(key) is str:
+                encoded = key.encode()
+                append(b's:%d:"' % len(encoded))
+                append(encoded)
+                append(b'";')
+            else:
+                _dump_key(key, out)
+            _dump(value, out)
+        append(b"}")
+    elif obj is None:
+        out.append(b"N;")
+    elif kind is bool:
+        out.append(b"b:1;" if obj else b"b:0;")
+    elif kind is float:
+        out.append(b"d:%s;" % repr(obj).encode())
+    elif kind is list or kind is tuple:
+        out.append(b"a:%d:{" % len(obj))
+        for index, value in enumerate(obj):
+            out.append(b"i:%d;" % index)
+            _dump(value, out)
+        out.append(b"}")
+    else:
+        _dump_other(obj, out)
+
+
+def _dump_other(obj: Any, out: list[bytes]) -> None:
+    """Append ``obj`` when its type is not one _dump() handles exactly."""
+    if isinstance(obj, str):
+        encoded = obj.encode()
+        out.append(b's:%d:"' % len(encoded))
+        out.append(encoded)
+        out.append(b'";')
+    elif isinstance(obj, bool):
+        out.append(b"b:1;" if obj else b"b:0;")
+    elif isinstance(obj, int):
+        out.append(b"i:%d;" % obj)
+    elif isinstance(obj, dict):
+        out.append(b"a:%d:{" % len(obj))
+        for key, value in obj.items():
+            _dump_key(key, out)
+            _dump(value, out)
+        out.append(b"}")
+    elif isinstance(obj, float):
+        out.append(b"d:%s;" % repr(obj).encode())
+    elif isinstance(obj, bytes):
+        out.append(b's:%d:"' % len(obj))
+        out.append(obj)
+        out.append(b'";')
+    elif isinstance(obj, (list, tuple)):
+        out.append(b"a:%d:{" % len(obj))
+        for index, value in enumerate(obj):
+            out.append(b"i:%d;" % index)
+            _dump(value, out)
+        out.append(b"}")
+    else:
+        # phpserialize.phpobject and anything else phpserialize knows about
+        out.append(phpserialize.dumps(obj))
+
+
+def _dump_key(key: Any, out: list[bytes]) -> None:
+    """Append a serialized array key; PHP keys are ints or strings."""
+    if isinstance(key, str):
+        encoded = key.encode()
+        out.append(b's:%d:"' % len(encoded))
+        out.append(encoded)
+        out.append(b'";')
+    elif isinstance(key, (int, float)):
+        # bool is an int subclass; floats are truncated like PHP does
+        out.append(b"i:%d;" % key)
+    elif isinstance(key, bytes):
+        out.append(b's:%d:"' % len(key))
+        out.append(key)
+        out.append(b'";')
+    elif key is None:
+        out.append(b's:0:"";')
+    else:
+        raise TypeError(f"can't serialize {type(key)!r} as key")
@@ -15,9 +15,10 @@ from .constants import (
     LOCK_SUFFIX,
     SESSION_PREFIX,
 )
+from .serializer import PHPSerializer, Serializer
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SessionConfig:
     """Configuration for PHP session management.
 
@@ -31,6 +32,27 @@ class SessionConfig:
         lock_suffix: Redis key suffix for lock keys.
         json_fields: Set of field names known to contain JSON.
         json_prefix: Prefix pattern for auto-detecting JSON fields.
+        serializer: Converts session dicts to and from Redis payloads.
+                    Defaults to PHP's php_serialize format.
+        decode_cache_size: Number of decoded sessions get() keeps for
+                           reuse while the stored payload is unchanged.
+                           0 disables the cache. Cached results are
+                           shared between calls and must not be mutated.
+        save_cache_size: Number of sessions for which save() remembers a
+                         hash of its last payload; saving identical data
+                         again only refreshes the expiry. 0 disables it.
+                         Only useful when this process is the session's
+                         sole writer.
+        exists_cache_ttl: Seconds for which exists() reuses what the last
+                          read or exists() call found for a session,
+                          instead of asking Redis. 0 disables it.
+        track_changes: Skip encoding the session on lock() exit when no
+                       top-level key was assigned or deleted. Values
+                       changed in place (session["cart"].append(...))
+                       are not noticed and must be reassigned.
+        touch_on_read: Refresh the session expiry when get() or
+                       get_many() reads it, with a single GETEX
+                       (requires Redis 6.2+).
 
     Example:
         >>> config = SessionConfig(
@@ -46,6 +68,12 @@ class SessionConfig:
     lock_suffix: str = LOCK_SUFFIX
     json_fields: frozenset[str] = field(default_factory=lambda: DEFAULT_JSON_FIELDS)
     json_prefix: str | None = "trace_list_"
+    serializer: Serializer = field(default_factory=PHPSerializer)
+    decode_cache_size: int = 0
+    save_cache_size: int = 0
+    exists_cache_ttl: float = 0.0
+    track_changes: bool = False
+    touch_on_read: bool = False
 
     def __post_init__(self) -> None:
         """Validate configuration values."""
@@ -55,3 +83,9 @@ class SessionConfig:
             raise ValueError("lock_timeout must be positive")
         if not self.session_prefix:
             raise ValueError("session_prefix cannot be empty")
+        if self.decode_cache_size < 0:
+            raise ValueError("decode_cache_size cannot be negative")
+        if self.save_cache_size < 0:
+            raise ValueError("save_cache_size cannot be negative")
+        if self.exists_cache_ttl < 0:
+            raise ValueError("exists_cache_ttl cannot be negative")
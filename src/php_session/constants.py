@@ -6,6 +6,7 @@ ensuring compatibility between Python and PHP session handling.
 
 from __future__ import annotations
 
+import hashlib
 import re
 from typing import Final
 
@@ -26,22 +27,153 @@ DEFAULT_JSON_FIELDS: frozenset[str] = frozenset(
     }
 )
 
+# Channel suffix on which lock releases are announced: {lock_key}:rel
+LOCK_RELEASE_CHANNEL_SUFFIX: Final[str] = ":rel"
+
 # Lua script for safe lock release
-# Matches PHP redis session handler's lock release mechanism exactly:
+# Matches PHP redis session handler's lock release mechanism:
 # - Only releases if token matches (prevents releasing other process's lock)
 # - Uses atomic EVAL to prevent race conditions
-RELEASE_LOCK_SCRIPT: Final[str] = """
+# Additionally publishes on {lock_key}:rel so Python waiters wake up immediately
+# (PHP does not publish, so waiters still fall back to polling with backoff)
+# lock() normally releases through SAVE_AND_RELEASE_SCRIPT; this script is
+# used when it must release without saving (the session failed to encode)
+RELEASE_LOCK_SCRIPT: Final[str] = f"""
 if redis.call("get", KEYS[1]) == ARGV[1] then
-    return redis.call("del", KEYS[1])
+    local deleted = redis.call("del", KEYS[1])
+    redis.call("publish", KEYS[1] .. "{LOCK_RELEASE_CHANNEL_SUFFIX}", "1")
+    return deleted
+else
+    return 0
+end
+"""
+
+# SHA1 of RELEASE_LOCK_SCRIPT, so it can be run via EVALSHA without re-sending
+# the script body (loaded on demand when Redis replies NOSCRIPT)
+RELEASE_LOCK_SHA: Final[str] = hashlib.sha1(RELEASE_LOCK_SCRIPT.encode()).hexdigest()
+
+# Lua script that saves the session and releases its lock atomically
+# KEYS[1] = session key, KEYS[2] = lock key
+# ARGV[1] = lock token, ARGV[2] = payload, ARGV[3] = session expiry in seconds
+# Like phpredis, the session is only written while the lock is still held
+# with our token; if it expired (and maybe went to another process) nothing
+# is written and 0 is returned
+# An empty payload means the session is unchanged: like PHP's
+# session.lazy_write, only its expiry is refreshed
+# The release part is RELEASE_LOCK_SCRIPT, so PHP sees the same lock protocol
+SAVE_AND_RELEASE_SCRIPT: Final[str] = f"""
+if redis.call("get", KEYS[2]) ~= ARGV[1] then
+    return 0
+end
+if ARGV[2] == "" then
+    redis.call("expire", KEYS[1], ARGV[3])
+else
+    redis.call("set", KEYS[1], ARGV[2], "EX", ARGV[3])
+end
+local deleted = redis.call("del", KEYS[2])
+redis.call("publish", KEYS[2] .. "{LOCK_RELEASE_CHANNEL_SUFFIX}", "1")
+return deleted
+"""
+
+SAVE_AND_RELEASE_SHA: Final[str] = hashlib.sha1(SAVE_AND_RELEASE_SCRIPT.encode()).hexdigest()
+
+# Lua script for lock acquisition fused with the initial session read
+# Same SET NX PX as PHP, but returns the session payload in the same round-trip:
+# - {1, payload} when the lock was acquired (payload is nil if no session yet)
+# - {0} when another process holds the lock
+ACQUIRE_AND_LOAD_SCRIPT: Final[str] = """
+if redis.call("set", KEYS[1], ARGV[1], "NX", "PX", ARGV[2]) then
+    return {1, redis.call("get", KEYS[2])}
 else
+    return {0}
+end
+"""
+
+ACQUIRE_AND_LOAD_SHA: Final[str] = hashlib.sha1(ACQUIRE_AND_LOAD_SCRIPT.encode()).hexdigest()
+
+# Lua script that sets one key of a PHP-serialized session in place
+# KEYS[1] = session key
+# ARGV[1] = PHP-serialized array key, ARGV[2] = PHP-serialized value,
+# ARGV[3] = session expiry in seconds
+# The stored a:N:{...} array is scanned entry by entry (values are skipped,
+# not decoded); the matching entry's value is replaced, or a new entry is
+# appended. The whole array is scanned so malformed payloads are rejected.
+# A missing or empty session becomes a one-entry array.
+# Returns 1 when written, 0 if the stored payload is not a PHP array
+SET_KEY_SCRIPT: Final[str] = """
+local data = redis.call("get", KEYS[1])
+if not data or data == "" then
+    redis.call("set", KEYS[1], "a:1:{" .. ARGV[1] .. ARGV[2] .. "}", "EX", ARGV[3])
+    return 1
+end
+
+local function skip(pos)
+    local tag = string.sub(data, pos, pos)
+    if tag == "N" then
+        return pos + 2
+    elseif tag == "i" or tag == "b" or tag == "d" then
+        return string.find(data, ";", pos, true) + 1
+    elseif tag == "s" then
+        local len, start = string.match(data, '^s:(%d+):"()', pos)
+        return start + tonumber(len) + 2
+    end
+    local count, start
+    if tag == "a" then
+        count, start = string.match(data, "^a:(%d+):{()", pos)
+    elseif tag == "O" then
+        local len, name = string.match(data, '^O:(%d+):"()', pos)
+        count, start = string.match(data, "^(%d+):{()", name + tonumber(len) + 2)
+    end
+    for _ = 1, 2 * tonumber(count) do
+        start = skip(start)
+    end
+    if string.sub(data, start, start) ~= "}" then
+        error("malformed array")
+    end
+    return start + 1
+end
+
+local ok, patched = pcall(function()
+    local count, first = string.match(data, "^a:(%d+):{()")
+    local pos, value_start, value_end = first, nil, nil
+    for _ = 1, tonumber(count) do
+        local next_start = skip(pos)
+        local next_end = skip(next_start)
+        if string.sub(data, pos, next_start - 1) == ARGV[1] then
+            value_start, value_end = next_start, next_end
+        end
+        pos = next_end
+    end
+    if string.sub(data, pos) ~= "}" then
+        error("malformed array")
+    end
+    if value_start then
+        return string.sub(data, 1, value_start - 1) .. ARGV[2]
+            .. string.sub(data, value_end)
+    end
+    return "a:" .. (tonumber(count) + 1) .. ":{" .. string.sub(data, first, pos - 1)
+        .. ARGV[1] .. ARGV[2] .. "}"
+end)
+if not ok then
     return 0
 end
+redis.call("set", KEYS[1], patched, "EX", ARGV[3])
+return 1
 """
 
+SET_KEY_SHA: Final[str] = hashlib.sha1(SET_KEY_SCRIPT.encode()).hexdigest()
+
+# PHP session ID length bounds
+PHPSESSID_MIN_LENGTH: Final[int] = 26
+PHPSESSID_MAX_LENGTH: Final[int] = 128
+
 # PHP session ID validation pattern
 # Default PHP session IDs are 26-128 alphanumeric characters (letters, digits, comma, dash)
 # Restrict to safer alphanumeric only for security (prevents injection attacks)
-PHPSESSID_PATTERN: Final[re.Pattern[str]] = re.compile(r"^[a-zA-Z0-9]{26,128}$")
+# sanitize_phpsessid() applies the same rule without the regex engine
+PHPSESSID_PATTERN: Final[re.Pattern[str]] = re.compile(
+    rf"^[a-zA-Z0-9]{{{PHPSESSID_MIN_LENGTH},{PHPSESSID_MAX_LENGTH}}}$"
+)
 
 # Default session expiration in seconds (24 hours, matching PHP default)
 DEFAULT_SESSION_EXPIRE: Final[int] = 86400
@@ -49,5 +181,8 @@ DEFAULT_SESSION_EXPIRE: Final[int] = 86400
 # Default lock timeout in seconds
 DEFAULT_LOCK_TIMEOUT: Final[float] = 30.0
 
-# Lock retry interval in seconds (like PHP)
+# Initial lock retry interval in seconds (like PHP)
 LOCK_RETRY_INTERVAL: Final[float] = 0.05
+
+# Upper bound for the exponentially growing lock retry interval in seconds
+LOCK_RETRY_MAX_INTERVAL: Final[float] = 0.5
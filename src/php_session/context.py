@@ -6,19 +6,58 @@ enabling dependency injection without explicit parameter passing.
 
 from __future__ import annotations
 
-from contextvars import ContextVar
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
 
 # ContextVar for current request's session_id (DI pattern)
 _current_session_id: ContextVar[str | None] = ContextVar("session_id", default=None)
 
 
-def set_current_session_id(session_id: str | None) -> None:
+def set_current_session_id(session_id: str | None) -> Token[str | None]:
     """Set session_id for current request (called by middleware).
 
     Args:
         session_id: The session ID to set, or None to clear.
+
+    Returns:
+        A token that restores the previous value when passed to
+        reset_current_session_id().
+    """
+    return _current_session_id.set(session_id)
+
+
+def reset_current_session_id(token: Token[str | None]) -> None:
+    """Restore the session_id that was current before a set.
+
+    Args:
+        token: The token returned by set_current_session_id().
+    """
+    _current_session_id.reset(token)
+
+
+@contextmanager
+def bind_session_id(session_id: str | None) -> Iterator[str | None]:
+    """Set session_id for the duration of a with block.
+
+    The previous value is restored on exit, also when the block raises,
+    so nested or concurrent scopes never leak into each other.
+
+    Args:
+        session_id: The session ID to use inside the block.
+
+    Yields:
+        The bound session ID.
+
+    Example:
+        with bind_session_id("abc123"):
+            cart = await manager.get("scart_items")
     """
-    _current_session_id.set(session_id)
+    token = _current_session_id.set(session_id)
+    try:
+        yield session_id
+    finally:
+        _current_session_id.reset(token)
 
 
 def get_current_session_id() -> str | None:
@@ -12,27 +12,38 @@ Install with: pip install py-php-session[starlette]
 from __future__ import annotations
 
 import logging
-from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-from starlette.types import ASGIApp
-
-from ..context import set_current_session_id
+from ..constants import PHPSESSID_MAX_LENGTH, PHPSESSID_MIN_LENGTH
+from ..context import _current_session_id
 from ..sanitize import sanitize_phpsessid
 
+if TYPE_CHECKING:
+    # Only needed for annotations: the middleware speaks plain ASGI, so
+    # importing it doesn't import Starlette
+    from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Byte values (indexing bytes yields ints)
+_BLANKS = b" \t"
+_SEMICOLON = ord(";")
+_QUOTE = ord('"')
+
 
-class PHPSessionMiddleware(BaseHTTPMiddleware):
+class PHPSessionMiddleware:
     """Middleware to set up PHP session context.
 
     Sets session_id in:
-    - request.state.session_id (for direct access in routes)
+    - request.state.session_id (for direct access in routes; None when
+      the request has no valid session cookie)
     - contextvars (for DI access in session_manager)
 
     Session data is NOT loaded here - use session_manager.get() or
     session_manager.lock() to load data lazily when needed.
 
+    Implemented as a plain ASGI middleware rather than a
+    BaseHTTPMiddleware subclass, so no extra task, task group or
+    response stream is created per request.
+
     Usage:
         from fastapi import FastAPI
         from php_session.contrib.starlette import PHPSessionMiddleware
@@ -59,31 +70,90 @@ class PHPSessionMiddleware(BaseHTTPMiddleware):
             logger: Optional logger for debugging.
             cookie_name: Name of the session cookie (default: PHPSESSID).
         """
-        super().__init__(app)
+        self.app = app
         self._logger = logger
         self._cookie_name = cookie_name
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Awaitable[Response]],
-    ) -> Response:
-        """Process the request and set up session context."""
-        raw_phpsessid: str | None = request.cookies.get(self._cookie_name)
-        phpsessid = sanitize_phpsessid(raw_phpsessid, logger=self._logger)
-
-        if phpsessid:
-            # Store in request.state for direct access
-            request.state.session_id = phpsessid
-            # Store in contextvars for session_manager DI
-            set_current_session_id(phpsessid)
-            if self._logger:
-                self._logger.debug(
-                    "Session context set: %s", phpsessid[:8] + "..."
-                )
+        self._cookie_prefix = cookie_name.encode("latin-1") + b"="
 
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Process the request and set up session context."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        phpsessid = self._get_session_id(scope)
+        # Store in request.state for direct access; always set (None when
+        # there is no valid cookie), so handlers can read it without getattr()
+        scope.setdefault("state", {})["session_id"] = phpsessid
+
+        if phpsessid is None and _current_session_id.get() is None:
+            # No session and no outer session_id to hide (cookie-less
+            # requests, mostly): nothing to set up or restore
+            await self.app(scope, receive, send)
+            return
+
+        if phpsessid and self._logger:
+            self._logger.debug("Session context set: %s", phpsessid[:8] + "...")
+
+        # Store in contextvars for session_manager DI. Set even when there
+        # is no valid cookie so the app never sees an outer session_id.
+        # The ContextVar is used directly, saving the helper calls per request.
+        token = _current_session_id.set(phpsessid)
         try:
-            return await call_next(request)
+            await self.app(scope, receive, send)
         finally:
-            # Clean up contextvars
-            set_current_session_id(None)
+            # Restore the previous value rather than overwriting it with None
+            _current_session_id.reset(token)
+
+    def _get_session_id(self, scope: Scope) -> str | None:
+        """Extract and validate the session cookie from the raw ASGI headers.
+
+        If the cookie appears more than once, the first well-formed value
+        wins, matching PHP's first-occurrence rule for valid cookies.
+        """
+        header: bytes | None = None
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                header = value
+                break
+        if header is None:
+            return None
+
+        # Scan for "<name>=" with find() rather than a regex search, which
+        # retries its (?:^|;) prefix at every offset of the header
+        prefix = self._cookie_prefix
+        first_value = None
+        start = header.find(prefix)
+        while start != -1:
+            # Must start a cookie: at the beginning or after ";" and blanks
+            before = start
+            while before and header[before - 1] in _BLANKS:
+                before -= 1
+            if before == 0 or header[before - 1] == _SEMICOLON:
+                value_start = start + len(prefix)
+                value_end = header.find(b";", value_start)
+                if value_end == -1:
+                    value_end = len(header)
+                session_id = header[value_start:value_end].rstrip(_BLANKS)
+                # Unquote PHPSESSID="..." like Starlette's cookie parser
+                if (
+                    len(session_id) >= 2
+                    and session_id[0] == _QUOTE
+                    and session_id[-1] == _QUOTE
+                ):
+                    session_id = session_id[1:-1]
+                if (
+                    PHPSESSID_MIN_LENGTH <= len(session_id) <= PHPSESSID_MAX_LENGTH
+                    and session_id.isalnum()  # bytes.isalnum() is ASCII-only
+                ):
+                    return session_id.decode("ascii")
+                if first_value is None:
+                    first_value = session_id
+            start = header.find(prefix, start + 1)
+
+        # Slow path: the cookie is absent or malformed. Let
+        # sanitize_phpsessid() decide and log the rejection.
+        if first_value is None:
+            return None
+        return sanitize_phpsessid(first_value.decode("latin-1"), logger=self._logger)
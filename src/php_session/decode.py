@@ -1,15 +1,45 @@
 """JSON field decoding utilities.
 
 Some PHP session variables store JSON strings that need parsing.
-This module handles automatic decoding of known JSON fields.
+This module handles automatic decoding of known JSON fields, and
+encoding them back to JSON strings before the session is written.
+
+Uses orjson when installed (pip install py-php-session[orjson]),
+falling back to the standard library json module.
 """
 
 from __future__ import annotations
 
-import contextlib
 import json
+from collections.abc import Callable
 from typing import Any
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+
+    def _json_loads(value: str) -> Any:
+        """Parse JSON with the standard library."""
+        return json.loads(value)
+
+    def _json_dumps(value: Any) -> str:
+        """Serialize compact JSON with the standard library."""
+        return json.dumps(value, separators=(",", ":"))
+
+else:
+
+    def _json_loads(value: str) -> Any:
+        """Parse JSON with orjson (raises a json.JSONDecodeError subclass)."""
+        return orjson.loads(value)
+
+    def _json_dumps(value: Any) -> str:
+        """Serialize compact JSON with orjson, or json for what it rejects."""
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # e.g. integers beyond 64 bits
+            return json.dumps(value, separators=(",", ":"))
+
 
 def decode_json_fields(
     data: dict[str, Any],
@@ -37,19 +67,115 @@ def decode_json_fields(
         >>> decode_json_fields(data, json_fields=frozenset({"cart"}))
         {'cart': ['item1', 'item2'], 'count': 5}
     """
-    for key, value in data.items():
-        if not isinstance(value, str):
-            continue
+    return make_json_field_decoder(json_fields, json_prefix)(data)
+
+
+def make_json_field_decoder(
+    json_fields: frozenset[str] | None = None,
+    json_prefix: str | None = "trace_list_",
+) -> Callable[[dict[str, Any]], dict[str, Any]]:
+    """Build a decode_json_fields() specialized for one configuration.
+
+    The field list, prefix and JSON parser are bound into a closure once,
+    and the prefix pass is left out entirely when prefix matching is
+    disabled, so the returned function does no per-call setup.
+    SessionManager builds one per instance.
+
+    Args:
+        json_fields: Set of field names known to contain JSON.
+        json_prefix: Prefix pattern for auto-detecting JSON fields,
+                    or None to disable prefix matching.
+
+    Returns:
+        A function that decodes JSON fields in place and returns its input.
+    """
+    fields = tuple(json_fields or ())
+    loads = _json_loads
+
+    # Look up the configured fields directly instead of testing every entry;
+    # only prefix matching needs a pass over the session. A plain try/except
+    # is cheaper than contextlib.suppress; JSONDecodeError (json and orjson)
+    # subclasses ValueError. Deserializers produce exact str values, so an
+    # identity check on the type replaces isinstance().
+    def decode_fields(data: dict[str, Any]) -> dict[str, Any]:
+        for key in fields:
+            value = data.get(key)
+            if type(value) is str:
+                try:
+                    data[key] = loads(value)
+                except ValueError:
+                    continue
+        return data
+
+    if not json_prefix:
+        return decode_fields
 
-        # Check known JSON fields or prefix pattern
-        should_decode = (json_fields and key in json_fields) or (
-            json_prefix and key.startswith(json_prefix)
-        )
+    prefix = json_prefix
+
+    def decode_fields_and_prefix(data: dict[str, Any]) -> dict[str, Any]:
+        for key in fields:
+            value = data.get(key)
+            if type(value) is str:
+                try:
+                    data[key] = loads(value)
+                except ValueError:
+                    continue
+        for key, value in data.items():
+            # PHP arrays can have int keys; only string keys can match
+            if type(value) is str and type(key) is str and key.startswith(prefix):
+                try:
+                    data[key] = loads(value)
+                except ValueError:
+                    continue
+        return data
+
+    return decode_fields_and_prefix
+
+
+def encode_json_fields(
+    data: dict[str, Any],
+    json_fields: frozenset[str] | None = None,
+    json_prefix: str | None = "trace_list_",
+) -> dict[str, Any]:
+    """Encode JSON fields back to JSON strings before serialization.
+
+    Inverse of decode_json_fields(), so that PHP keeps reading these
+    fields as JSON strings rather than PHP arrays.
+
+    Args:
+        data: Session data dictionary, possibly with decoded JSON fields.
+        json_fields: Set of field names known to contain JSON.
+                    If None, no specific fields are encoded.
+        json_prefix: Prefix pattern for auto-detecting JSON fields.
+                    Set to None to disable prefix matching.
+
+    Returns:
+        Session data with JSON fields encoded. The input dict is returned
+        as-is when nothing needs encoding, otherwise a copy is made.
+
+    Example:
+        >>> data = {"cart": ["item1", "item2"], "count": 5}
+        >>> encode_json_fields(data, json_fields=frozenset({"cart"}))
+        {'cart': '["item1","item2"]', 'count': 5}
+    """
+    encoded = data
 
-        if not should_decode:
-            continue
+    if json_fields:
+        for key in json_fields:
+            if key in data and not isinstance(data[key], str):
+                if encoded is data:
+                    encoded = dict(data)
+                encoded[key] = _json_dumps(data[key])
 
-        with contextlib.suppress(json.JSONDecodeError, ValueError):
-            data[key] = json.loads(value)
+    if json_prefix:
+        for key, value in data.items():
+            if (
+                not isinstance(value, str)
+                and type(key) is str
+                and key.startswith(json_prefix)
+            ):
+                if encoded is data:
+                    encoded = dict(data)
+                encoded[key] = _json_dumps(value)
 
-    return data
+    return encoded
@@ -10,20 +10,207 @@ Reference: PHP redis session handler uses the same lock key format and mechanism
 from __future__ import annotations
 
 import asyncio
+import itertools
 import logging
+import os
+import random
 import secrets
+import time
+from collections import OrderedDict
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
-from typing import Any
+from typing import Any, TypeVar
 
-import phpserialize
 from redis.asyncio import Redis
+from redis.asyncio.client import PubSub
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import NoScriptError
 
+from . import _phpser
 from .config import SessionConfig
-from .constants import LOCK_RETRY_INTERVAL, RELEASE_LOCK_SCRIPT
+from .constants import (
+    ACQUIRE_AND_LOAD_SCRIPT,
+    ACQUIRE_AND_LOAD_SHA,
+    LOCK_RELEASE_CHANNEL_SUFFIX,
+    LOCK_RETRY_INTERVAL,
+    LOCK_RETRY_MAX_INTERVAL,
+    RELEASE_LOCK_SCRIPT,
+    RELEASE_LOCK_SHA,
+    SAVE_AND_RELEASE_SCRIPT,
+    SAVE_AND_RELEASE_SHA,
+    SET_KEY_SCRIPT,
+    SET_KEY_SHA,
+)
 from .context import get_current_session_id
-from .decode import decode_json_fields
+from .decode import encode_json_fields, make_json_field_decoder
 from .exceptions import SessionContextError, SessionLockError
+from .serializer import _MSGPACK_MAP_MARKERS, MsgPackSerializer, PHPSerializer
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None  # type: ignore[assignment]
+
+_T = TypeVar("_T")
+
+# Lock tokens only need to be unique, not unpredictable: a random
+# per-process prefix plus a counter avoids a CSPRNG call per lock.
+# Reseeded after fork so worker processes never share a token sequence.
+_token_prefix = secrets.token_hex(8)
+_token_counter = itertools.count()
+
+
+def _reseed_lock_tokens() -> None:
+    """Start a fresh token sequence (called in forked children)."""
+    global _token_prefix, _token_counter
+    _token_prefix = secrets.token_hex(8)
+    _token_counter = itertools.count()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reseed_lock_tokens)
+
+
+def _new_lock_token() -> str:
+    """Return a process-unique 32-hex-char lock token."""
+    return f"{_token_prefix}{next(_token_counter):016x}"
+
+
+class _DirtyDict(dict[str, Any]):
+    """Session dict that records whether a top-level key was changed.
+
+    Used by lock() with SessionConfig.track_changes. Values mutated in
+    place are not tracked.
+    """
+
+    __slots__ = ("dirty",)
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        super().__init__(data)
+        self.dirty = False
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.dirty = True
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self.dirty = True
+        super().__delitem__(key)
+
+    def __ior__(self, other: Any) -> _DirtyDict:  # type: ignore[misc,override]
+        self.dirty = True
+        return super().__ior__(other)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        self.dirty = True
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self.dirty = True
+        return super().setdefault(key, default)
+
+    def pop(self, *args: Any) -> Any:
+        self.dirty = True
+        return super().pop(*args)
+
+    def popitem(self) -> tuple[str, Any]:
+        self.dirty = True
+        return super().popitem()
+
+    def clear(self) -> None:
+        self.dirty = True
+        super().clear()
+
+
+class _ReleaseListener:
+    """One pub/sub subscription shared by all of a manager's lock waiters.
+
+    The first waiter opens the connection and starts a reader task that
+    wakes the waiters of each announced channel; the connection is closed
+    again when the last waiter leaves. However many lock() calls wait, at
+    most one pooled connection is held for listening.
+    """
+
+    def __init__(self, redis: Redis[bytes]) -> None:
+        self._redis = redis
+        self._pubsub: PubSub | None = None
+        self._reader: asyncio.Task[None] | None = None
+        # channel -> events of the waiters listening on it
+        self._waiters: dict[bytes, set[asyncio.Event]] = {}
+        # Serializes (un)subscribing and closing, so an UNSUBSCRIBE still in
+        # flight never runs on a connection another waiter just closed
+        self._lock = asyncio.Lock()
+
+    async def add(self, channel: bytes) -> asyncio.Event:
+        """Listen on ``channel``; the returned event is set on each release.
+
+        Raises:
+            redis.exceptions.ConnectionError: If no connection is available
+                (e.g. the pool's max_connections is reached).
+        """
+        event = asyncio.Event()
+        async with self._lock:
+            waiters = self._waiters.setdefault(channel, set())
+            waiters.add(event)
+            if len(waiters) > 1:
+                return event
+            try:
+                if self._pubsub is None:
+                    self._pubsub = self._redis.pubsub()
+                await self._pubsub.subscribe(channel)
+            except BaseException:
+                await self._discard(channel, event)
+                raise
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read(self._pubsub))
+        return event
+
+    async def remove(self, channel: bytes, event: asyncio.Event) -> None:
+        """Stop waking ``event``; close the connection if nobody waits."""
+        async with self._lock:
+            await self._discard(channel, event)
+
+    async def _discard(self, channel: bytes, event: asyncio.Event) -> None:
+        """Body of remove(); the caller holds the lock."""
+        waiters = self._waiters.get(channel)
+        if waiters is None:
+            return
+        waiters.discard(event)
+        if waiters:
+            return
+        del self._waiters[channel]
+        pubsub = self._pubsub
+        if pubsub is None:
+            return
+        if self._waiters:
+            await pubsub.unsubscribe(channel)
+            return
+        reader, self._reader, self._pubsub = self._reader, None, None
+        if reader is not None:
+            reader.cancel()
+        await pubsub.aclose()  # type: ignore[attr-defined]
+
+    async def _read(self, pubsub: PubSub) -> None:
+        """Wake the waiters of every channel a release is announced on."""
+        try:
+            while True:
+                # timeout=None blocks until a message arrives
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=None,  # type: ignore[arg-type]
+                )
+                if message is None:
+                    continue
+                channel = message["channel"]
+                if isinstance(channel, str):
+                    channel = channel.encode()
+                for event in self._waiters.get(channel, ()):
+                    event.set()
+        except Exception:
+            # Connection trouble: waiters keep retrying on their backoff
+            # timer, and the next new subscription starts a fresh reader
+            return
 
 
 class SessionManager:
@@ -66,7 +253,22 @@ class SessionManager:
         self._redis = redis
         self._config = config or SessionConfig()
         self._logger = logger
-        self._release_lock_script = self._redis.register_script(RELEASE_LOCK_SCRIPT)
+        # Keys are built as bytes once per call and handed to redis-py as-is
+        self._session_prefix = self._config.session_prefix.encode()
+        self._lock_suffix = self._config.lock_suffix.encode()
+        self._release_channel_suffix = LOCK_RELEASE_CHANNEL_SUFFIX.encode()
+        self._decode_json_fields = make_json_field_decoder(
+            self._config.json_fields, self._config.json_prefix
+        )
+        # session_id -> (raw payload, decoded data), least recently used first
+        self._decode_cache: OrderedDict[str, tuple[bytes, dict[str, Any]]] = (
+            OrderedDict()
+        )
+        # session_id -> hash of the payload save() last wrote, LRU first
+        self._save_cache: OrderedDict[str, int] = OrderedDict()
+        # session_id -> (expiry time, exists), soonest expiry first
+        self._exists_cache: OrderedDict[str, tuple[float, bool]] = OrderedDict()
+        self._release_listener = _ReleaseListener(redis)
 
     def _resolve_session_id(self, session_id: str | None) -> str:
         """Resolve session_id from parameter or contextvars.
@@ -88,25 +290,142 @@ class SessionManager:
             raise SessionContextError()
         return ctx_session_id
 
-    def _session_key(self, session_id: str) -> str:
+    def _forget_session(self, session_id: str) -> None:
+        """Drop cached state for a session that is about to change."""
+        self._decode_cache.pop(session_id, None)
+        self._save_cache.pop(session_id, None)
+        self._exists_cache.pop(session_id, None)
+
+    def _session_key(self, session_id: str) -> bytes:
         """Build Redis key for session data."""
-        return f"{self._config.session_prefix}{session_id}"
+        return self._session_prefix + session_id.encode()
 
-    def _lock_key(self, session_id: str) -> str:
+    def _lock_key(self, session_id: str) -> bytes:
         """Build Redis key for session lock (PHP compatible format)."""
-        return f"{self._session_key(session_id)}{self._config.lock_suffix}"
+        return self._session_key(session_id) + self._lock_suffix
 
-    def _decode_session(self, raw: bytes) -> dict[str, Any]:
-        """Decode raw PHP-serialized session data."""
-        data: dict[str, Any] = phpserialize.loads(
-            raw,
-            decode_strings=True,
-            object_hook=lambda _name, d: dict(d),
+    async def _evalsha(
+        self,
+        sha: str,
+        script: str,
+        keys: list[bytes],
+        args: list[Any],
+    ) -> Any:
+        """Run a Lua script by SHA, loading it first if Redis lost it.
+
+        Args:
+            sha: Precomputed SHA1 of the script.
+            script: Script source, sent only on NOSCRIPT.
+            keys: Redis keys the script touches.
+            args: Additional script arguments.
+
+        Returns:
+            The script's return value.
+        """
+        try:
+            return await self._redis.evalsha(sha, len(keys), *keys, *args)  # type: ignore[no-untyped-call]
+        except NoScriptError:
+            await self._redis.script_load(script)  # type: ignore[no-untyped-call]
+            return await self._redis.evalsha(sha, len(keys), *keys, *args)  # type: ignore[no-untyped-call]
+
+    async def _try_acquire(
+        self,
+        session_key: bytes,
+        lock_key: bytes,
+        token: str,
+        lock_px: int,
+    ) -> tuple[bool, bytes | None]:
+        """Attempt to acquire the session lock and read the session at once.
+
+        Returns:
+            Tuple of (acquired, raw session payload or None).
+        """
+        result = await self._evalsha(
+            ACQUIRE_AND_LOAD_SHA,
+            ACQUIRE_AND_LOAD_SCRIPT,
+            [lock_key, session_key],
+            [token, lock_px],
         )
-        return decode_json_fields(
-            data,
-            json_fields=self._config.json_fields,
-            json_prefix=self._config.json_prefix,
+        if not result[0]:
+            return False, None
+        return True, result[1] if len(result) > 1 else None
+
+    @staticmethod
+    async def _wait_for_release(released: asyncio.Event, timeout: float) -> None:
+        """Wait up to ``timeout`` seconds for a lock release announcement."""
+        try:
+            await asyncio.wait_for(released.wait(), timeout)
+        except asyncio.TimeoutError:
+            return
+        released.clear()
+
+    async def _read_session(self, session_id: str) -> bytes | None:
+        """Read a raw session payload, refreshing its expiry if configured.
+
+        With touch_on_read, GETEX reads and refreshes in one command
+        instead of a GET followed by an EXPIRE.
+        """
+        session_key = self._session_key(session_id)
+        raw: bytes | None
+        if self._config.touch_on_read:
+            raw = await self._redis.getex(session_key, ex=self._config.session_expire)
+        else:
+            raw = await self._redis.get(session_key)
+        self._remember_exists(session_id, raw is not None)
+        return raw
+
+    def _remember_exists(self, session_id: str, exists: bool) -> None:
+        """Record whether a session exists, for exists_cache_ttl seconds."""
+        ttl = self._config.exists_cache_ttl
+        if not ttl:
+            return
+        now = time.monotonic()
+        cache = self._exists_cache
+        cache[session_id] = (now + ttl, exists)
+        cache.move_to_end(session_id)
+        # Entries are kept in expiry order: drop the stale ones at the front
+        while next(iter(cache.values()))[0] <= now:
+            cache.popitem(last=False)
+
+    def _decode_session(self, raw: bytes) -> dict[str, Any]:
+        """Decode a raw session payload with the configured serializer."""
+        return self._decode_json_fields(self._config.serializer.loads(raw))
+
+    def _decode_session_cached(self, session_id: str, raw: bytes) -> dict[str, Any]:
+        """Decode session data, reusing the last result if raw is unchanged.
+
+        Only used by get(): the returned dict may be shared with earlier
+        callers, so it must not be handed out for modification.
+        """
+        max_size = self._config.decode_cache_size
+        if not max_size:
+            return self._decode_session(raw)
+
+        cache = self._decode_cache
+        entry = cache.get(session_id)
+        if entry is not None and entry[0] == raw:
+            cache.move_to_end(session_id)
+            return entry[1]
+
+        data = self._decode_session(raw)
+        cache[session_id] = (raw, data)
+        cache.move_to_end(session_id)
+        if len(cache) > max_size:
+            cache.popitem(last=False)
+        return data
+
+    def _encode_session(self, data: dict[str, Any]) -> bytes:
+        """Encode session data with the configured serializer.
+
+        JSON fields decoded by _decode_session() are turned back into
+        JSON strings so the stored format stays what PHP expects.
+        """
+        return self._config.serializer.dumps(
+            encode_json_fields(
+                data,
+                json_fields=self._config.json_fields,
+                json_prefix=self._config.json_prefix,
+            )
         )
 
     @asynccontextmanager
@@ -118,7 +437,8 @@ class SessionManager:
 
         PHP Compatibility:
             - Lock key: {SESSION_PREFIX}{session_id}_LOCK (same as PHP)
-            - Lock acquire: SET key token NX PX expiry_ms (same as PHP)
+            - Lock acquire: SET key token NX PX expiry_ms (same as PHP),
+              run in a Lua script that also reads the session data
             - Lock release: Lua script checking token (same as PHP)
             - Python waits for PHP's lock, PHP waits for Python's lock
 
@@ -138,53 +458,162 @@ class SessionManager:
                 # auto-saved when exiting
         """
         resolved_id = self._resolve_session_id(session_id)
-        lock_key = self._lock_key(resolved_id)
-        token = secrets.token_hex(16)
-        acquired = False
-
-        # Acquire lock (matching PHP's SET NX PX pattern)
-        start = asyncio.get_event_loop().time()
-        while asyncio.get_event_loop().time() - start < self._config.lock_timeout:
-            result = await self._redis.set(
-                lock_key,
-                token,
-                nx=True,
-                px=int(self._config.lock_timeout * 1000),
-            )
-            if result:
-                acquired = True
-                break
-            await asyncio.sleep(LOCK_RETRY_INTERVAL)
-
-        if not acquired:
-            raise SessionLockError(resolved_id, self._config.lock_timeout)
+        self._forget_session(resolved_id)
+        session_key = self._session_key(resolved_id)
+        lock_key = session_key + self._lock_suffix
+        token = _new_lock_token()
+        lock_px = int(self._config.lock_timeout * 1000)
+
+        # Acquire lock (matching PHP's SET NX PX pattern) and load session data.
+        # The deadline is checked between attempts rather than enforced with
+        # asyncio.timeout(): cancelling an in-flight acquire script could
+        # leave a lock we hold in Redis with nobody to release it.
+        deadline = time.monotonic() + self._config.lock_timeout
+        acquired, raw = await self._try_acquire(session_key, lock_key, token, lock_px)
+        channel = lock_key + self._release_channel_suffix
+        release_event: asyncio.Event | None = None
+        subscribed = False
+        delay = LOCK_RETRY_INTERVAL
+        try:
+            while not acquired:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise SessionLockError(resolved_id, self._config.lock_timeout)
+                if not subscribed:
+                    # Listen for release announcements on the manager's shared
+                    # subscription, then retry right away in case the lock was
+                    # released before we subscribed
+                    subscribed = True
+                    try:
+                        release_event = await self._release_listener.add(channel)
+                    except RedisConnectionError:
+                        # No connection to spare for listening (pool
+                        # exhausted): fall back to plain backoff polling
+                        if self._logger:
+                            self._logger.debug(
+                                "Lock release listener unavailable, polling: %s",
+                                resolved_id[:8] + "...",
+                            )
+                else:
+                    # Capped exponential backoff with jitter, cut short when
+                    # a Python holder announces the release. Never wait
+                    # past the deadline.
+                    timeout = min(delay * (0.5 + random.random()), remaining)
+                    if release_event is None:
+                        await asyncio.sleep(timeout)
+                    else:
+                        await self._wait_for_release(release_event, timeout)
+                    delay = min(delay * 2, LOCK_RETRY_MAX_INTERVAL)
+                acquired, raw = await self._try_acquire(
+                    session_key, lock_key, token, lock_px
+                )
+        finally:
+            if release_event is not None:
+                # A failed UNSUBSCRIBE or close must not mask the outcome:
+                # a lock we just acquired still has to reach the save +
+                # release below, or it stays held until lock_timeout
+                try:
+                    await self._release_listener.remove(channel, release_event)
+                except Exception:
+                    if self._logger:
+                        self._logger.warning(
+                            "Lock release listener cleanup failed: %s",
+                            resolved_id[:8] + "...",
+                            exc_info=True,
+                        )
 
         if self._logger:
             self._logger.debug(
                 "Session lock acquired: %s", resolved_id[:8] + "..."
             )
 
-        # Load session data
-        raw = await self._redis.get(self._session_key(resolved_id))
         session_data: dict[str, Any] = {}
         if raw:
             session_data = self._decode_session(raw)
+        if self._config.track_changes:
+            session_data = _DirtyDict(session_data)
 
+        # Uncontended, lock() makes two round trips: the acquire script above
+        # and the save + release script below. Each checks a connection out
+        # of the pool only for its own duration, so no connection is pinned
+        # while the caller's block runs.
         try:
             yield session_data  # User can modify this dict directly
         finally:
-            # Auto-save session data
-            await self._redis.set(
-                self._session_key(resolved_id),
-                phpserialize.dumps(session_data),
-                ex=self._config.session_expire,
+            # Auto-save session data and release lock in one atomic script.
+            # Like PHP's session.lazy_write, an unchanged session is not
+            # rewritten; only its expiry is refreshed. With track_changes, a
+            # session whose keys were never assigned is not even encoded.
+            payload: bytes | None
+            try:
+                if isinstance(session_data, _DirtyDict) and not session_data.dirty:
+                    payload = None
+                else:
+                    payload = self._encode_session(session_data)
+            except Exception:
+                # Unencodable session: nothing can be saved, but don't leave
+                # the lock held (and other requests stalled) until it expires
+                await self._release_lock(lock_key, token)
+                raise
+            released = await self._save_and_release(
+                session_key, lock_key, token, None if payload == raw else payload
             )
-            # Release lock using Lua script (same as PHP)
-            await self._release_lock_script(keys=[lock_key], args=[token])
+            # The block may have cached exists() or save() results that the
+            # write just made stale
+            self._forget_session(resolved_id)
             if self._logger:
-                self._logger.debug(
-                    "Session saved and lock released: %s", resolved_id[:8] + "..."
-                )
+                if released:
+                    self._logger.debug(
+                        "Session saved and lock released: %s", resolved_id[:8] + "..."
+                    )
+                else:
+                    self._logger.warning(
+                        "Session lock expired before save, changes discarded: %s",
+                        resolved_id[:8] + "...",
+                    )
+
+    async def _release_lock(self, lock_key: bytes, token: str) -> bool:
+        """Release the session lock without saving, if it is still ours.
+
+        Returns:
+            True if released, False if the lock was no longer ours.
+        """
+        released = await self._evalsha(
+            RELEASE_LOCK_SHA, RELEASE_LOCK_SCRIPT, [lock_key], [token]
+        )
+        return bool(released)
+
+    async def _save_and_release(
+        self,
+        session_key: bytes,
+        lock_key: bytes,
+        token: str,
+        payload: bytes | None,
+    ) -> bool:
+        """Save session data and release its lock in a single Lua script.
+
+        Running both in one script saves a round-trip and leaves no window
+        where the new data is stored but the lock is still held. Like
+        phpredis, nothing is written once the lock has expired, since
+        another process may own the session by then.
+
+        Args:
+            session_key: Redis key of the session data.
+            lock_key: Redis key of the session lock.
+            token: Token the lock was acquired with.
+            payload: Serialized session, or None if it is unchanged and
+                     only the expiry needs refreshing.
+
+        Returns:
+            True if saved and released, False if the lock was no longer ours.
+        """
+        released = await self._evalsha(
+            SAVE_AND_RELEASE_SHA,
+            SAVE_AND_RELEASE_SCRIPT,
+            [session_key, lock_key],
+            [token, payload or b"", self._config.session_expire],
+        )
+        return bool(released)
 
     async def get(
         self,
@@ -199,28 +628,162 @@ class SessionManager:
 
         Returns:
             Session data dict, specific key value, or None if not found.
+            With SessionConfig.decode_cache_size set, repeated calls may
+            return the same objects, so treat them as read-only.
 
         Raises:
             SessionContextError: If no session_id available.
         """
         resolved_id = self._resolve_session_id(session_id)
-        raw = await self._redis.get(self._session_key(resolved_id))
+        raw = await self._read_session(resolved_id)
         if raw is None:
             return None
 
-        data = self._decode_session(raw)
+        if (
+            key is not None
+            and not self._config.decode_cache_size
+            and isinstance(self._config.serializer, PHPSerializer)
+        ):
+            # Decode only the requested entry instead of the whole session
+            value = _phpser.loads_item(raw, key)
+            if value is None:
+                return None
+            return self._decode_json_fields({key: value})[key]
+
+        data = self._decode_session_cached(resolved_id, raw)
 
         if key is None:
             return data
         return data.get(key)
 
+    async def get_many(
+        self,
+        keys: list[str],
+        session_id: str | None = None,
+    ) -> dict[str, Any]:
+        """Get several session keys with one read and one decode (no lock).
+
+        Args:
+            keys: Session keys to return.
+            session_id: Explicit session ID, or None to use contextvars.
+
+        Returns:
+            Dict mapping each requested key to its value, or None if the
+            key or the whole session is missing.
+
+        Raises:
+            SessionContextError: If no session_id available.
+        """
+        resolved_id = self._resolve_session_id(session_id)
+        raw = await self._read_session(resolved_id)
+        if raw is None:
+            return dict.fromkeys(keys)
+
+        data = self._decode_session_cached(resolved_id, raw)
+        return {key: data.get(key) for key in keys}
+
+    async def get_struct(
+        self,
+        model: type[_T],
+        session_id: str | None = None,
+    ) -> _T | None:
+        """Read the session as a typed object (read-only, no lock).
+
+        Requires msgspec. The model is usually a msgspec.Struct listing the
+        session keys the caller needs; other keys are ignored. With
+        MsgPackSerializer, msgpack payloads are decoded straight into the
+        struct in C, without building the session dict, as long as the
+        struct has no JSON fields. Everything else is decoded as usual and
+        converted with msgspec.convert().
+
+        Args:
+            model: msgspec.Struct subclass, or any type msgspec can convert to.
+            session_id: Explicit session ID, or None to use contextvars.
+
+        Returns:
+            The session as a ``model`` instance, or None if not found.
+
+        Raises:
+            ImportError: If msgspec is not installed.
+            ValueError: If the session does not match the model
+                        (msgspec.ValidationError).
+            SessionContextError: If no session_id available.
+
+        Example:
+            class Cart(msgspec.Struct):
+                cart_count: int = 0
+
+            cart = await manager.get_struct(Cart, session_id="abc123")
+        """
+        if msgspec is None:
+            raise ImportError(
+                "get_struct() requires msgspec: pip install py-php-session[msgspec]"
+            )
+
+        resolved_id = self._resolve_session_id(session_id)
+        raw = await self._read_session(resolved_id)
+        if raw is None:
+            return None
+
+        fields = getattr(model, "__struct_encode_fields__", None)
+        if (
+            fields is not None
+            and isinstance(self._config.serializer, MsgPackSerializer)
+            and raw[:1]
+            and raw[0] in _MSGPACK_MAP_MARKERS
+            and not self._has_json_fields(fields)
+        ):
+            return msgspec.msgpack.decode(raw, type=model)
+        return msgspec.convert(self._decode_session(raw), type=model)
+
+    def _has_json_fields(self, keys: tuple[str, ...]) -> bool:
+        """Check whether any of the keys is decoded as JSON."""
+        prefix = self._config.json_prefix
+        return any(
+            key in self._config.json_fields or (prefix and key.startswith(prefix))
+            for key in keys
+        )
+
+    async def mget_sessions(
+        self,
+        session_ids: list[str],
+    ) -> dict[str, dict[str, Any]]:
+        """Read several sessions in a single MGET round-trip (no lock).
+
+        Intended for bulk and admin tooling; request handlers should keep
+        using get() or lock() for the current session.
+
+        Args:
+            session_ids: Session IDs to read.
+
+        Returns:
+            Dict mapping each existing session ID to its decoded data.
+            Sessions that do not exist are omitted.
+        """
+        if not session_ids:
+            return {}
+
+        raws = await self._redis.mget(
+            [self._session_key(session_id) for session_id in session_ids]
+        )
+        return {
+            session_id: self._decode_session(raw)
+            for session_id, raw in zip(session_ids, raws, strict=True)
+            if raw is not None
+        }
+
     async def set(
         self,
         key: str,
         value: Any,
         session_id: str | None = None,
     ) -> None:
-        """Set a session key (use lock() for safety in concurrent scenarios).
+        """Set a session key (use lock() to change several keys together).
+
+        With PHPSerializer the key is patched into the stored payload by a
+        Lua script in one atomic round-trip. Other serializers, or stored
+        payloads the script cannot parse, are read, updated and written
+        back from Python.
 
         Args:
             key: Session key to set.
@@ -231,26 +794,43 @@ class SessionManager:
             SessionContextError: If no session_id available.
         """
         resolved_id = self._resolve_session_id(session_id)
-
-        # Read current session
-        raw = await self._redis.get(self._session_key(resolved_id))
-        data: dict[str, Any] = {}
-        if raw:
-            data = phpserialize.loads(
-                raw,
-                decode_strings=True,
-                object_hook=lambda _name, d: dict(d),
+        self._forget_session(resolved_id)
+        session_key = self._session_key(resolved_id)
+
+        # PHP-serialized sessions are patched in place by a Lua script: one
+        # round-trip, and no window for another writer between read and write
+        written = False
+        if isinstance(self._config.serializer, PHPSerializer):
+            stored = encode_json_fields(
+                {key: value},
+                json_fields=self._config.json_fields,
+                json_prefix=self._config.json_prefix,
+            )[key]
+            written = bool(
+                await self._evalsha(
+                    SET_KEY_SHA,
+                    SET_KEY_SCRIPT,
+                    [session_key],
+                    [
+                        _phpser.dumps_key(key),
+                        _phpser.dumps(stored),
+                        self._config.session_expire,
+                    ],
+                )
             )
 
-        # Update key
-        data[key] = value
+        if not written:
+            # Other serializers, or a stored payload the script can't patch:
+            # read, update and write back from Python
+            raw = await self._redis.get(session_key)
+            data = self._decode_session(raw) if raw else {}
+            data[key] = value
+            await self._redis.set(
+                session_key,
+                self._encode_session(data),
+                ex=self._config.session_expire,
+            )
 
-        # Write back
-        await self._redis.set(
-            self._session_key(resolved_id),
-            phpserialize.dumps(data),
-            ex=self._config.session_expire,
-        )
         if self._logger:
             self._logger.info(
                 "Session key set: %s, key=%s", resolved_id[:8] + "...", key
@@ -263,6 +843,10 @@ class SessionManager:
     ) -> None:
         """Save entire session data (use lock() for safety).
 
+        With SessionConfig.save_cache_size set, a save() that would write
+        the same bytes as this manager's previous save() of the session
+        only refreshes its expiry.
+
         Args:
             data: Complete session data dict to save.
             session_id: Explicit session ID, or None to use contextvars.
@@ -271,11 +855,37 @@ class SessionManager:
             SessionContextError: If no session_id available.
         """
         resolved_id = self._resolve_session_id(session_id)
-        await self._redis.set(
-            self._session_key(resolved_id),
-            phpserialize.dumps(data),
-            ex=self._config.session_expire,
-        )
+        self._decode_cache.pop(resolved_id, None)
+        session_key = self._session_key(resolved_id)
+        payload = self._encode_session(data)
+
+        cache = self._save_cache
+        max_size = self._config.save_cache_size
+        if max_size:
+            digest = hash(payload)
+            # Same bytes as this manager's last save(): like PHP's
+            # session.lazy_write, only refresh the expiry. EXPIRE returns
+            # false if the key is gone (expired, evicted or deleted
+            # elsewhere); then the session is written again below.
+            if cache.get(resolved_id) == digest and await self._redis.expire(
+                session_key, self._config.session_expire
+            ):
+                cache.move_to_end(resolved_id)
+                self._exists_cache.pop(resolved_id, None)
+                if self._logger:
+                    self._logger.info(
+                        "Session unchanged, expiry refreshed: %s",
+                        resolved_id[:8] + "...",
+                    )
+                return
+
+        await self._redis.set(session_key, payload, ex=self._config.session_expire)
+        self._exists_cache.pop(resolved_id, None)
+        if max_size:
+            cache[resolved_id] = digest
+            cache.move_to_end(resolved_id)
+            if len(cache) > max_size:
+                cache.popitem(last=False)
         if self._logger:
             self._logger.info("Session saved: %s", resolved_id[:8] + "...")
 
@@ -295,6 +905,7 @@ class SessionManager:
             SessionContextError: If no session_id available.
         """
         resolved_id = self._resolve_session_id(session_id)
+        self._forget_session(resolved_id)
         result = await self._redis.delete(self._session_key(resolved_id))
         if self._logger:
             self._logger.info(
@@ -310,6 +921,10 @@ class SessionManager:
     ) -> bool:
         """Check if a session exists.
 
+        With SessionConfig.exists_cache_ttl set, a read or exists() check
+        of the same session within that many seconds answers without
+        asking Redis.
+
         Args:
             session_id: Explicit session ID, or None to use contextvars.
 
@@ -320,5 +935,10 @@ class SessionManager:
             SessionContextError: If no session_id available.
         """
         resolved_id = self._resolve_session_id(session_id)
+        entry = self._exists_cache.get(resolved_id)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
         result = await self._redis.exists(self._session_key(resolved_id))
+        self._remember_exists(resolved_id, result > 0)
         return result > 0
@@ -0,0 +1,41 @@
+"""Event loop setup helpers.
+
+Every SessionManager call is a Redis round-trip on the asyncio event
+loop. uvloop, a libuv-based drop-in loop, lowers the per-I/O overhead of
+those round-trips compared with the default selector loop.
+
+Install uvloop support with: pip install py-php-session[uvloop]
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+_T = TypeVar("_T")
+
+
+def run_with_uvloop(main: Coroutine[Any, Any, _T]) -> _T:
+    """Run a coroutine on a new uvloop event loop, like asyncio.run().
+
+    Uses uvloop.run(), which creates the loop through a loop factory
+    instead of the event loop policy API deprecated in Python 3.14. Falls
+    back to asyncio.run() when uvloop is not installed.
+
+    Args:
+        main: Coroutine to run, typically the program's entry point.
+
+    Returns:
+        The coroutine's result.
+
+    Example:
+        run_with_uvloop(main())
+    """
+    try:
+        import uvloop  # type: ignore[import-not-found,unused-ignore]
+    except ImportError:
+        return asyncio.run(main)
+
+    result: _T = uvloop.run(main)
+    return result
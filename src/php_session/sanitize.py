@@ -9,7 +9,7 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
-from .constants import PHPSESSID_PATTERN
+from .constants import PHPSESSID_MAX_LENGTH, PHPSESSID_MIN_LENGTH
 
 if TYPE_CHECKING:
     pass
@@ -46,8 +46,15 @@ def sanitize_phpsessid(
     # Strip whitespace (security: prevent bypass with padded IDs)
     session_id = session_id.strip()
 
-    # Validate format (alphanumeric only, 26-128 chars)
-    if not PHPSESSID_PATTERN.match(session_id):
+    # Validate format (ASCII alphanumeric only, 26-128 chars), equivalent to
+    # PHPSESSID_PATTERN. isascii() must come first: isalnum() alone accepts
+    # non-ASCII letters and digits. Null bytes and other control or special
+    # characters are rejected by isalnum().
+    if not (
+        PHPSESSID_MIN_LENGTH <= len(session_id) <= PHPSESSID_MAX_LENGTH
+        and session_id.isascii()
+        and session_id.isalnum()
+    ):
         if logger:
             logger.warning(
                 "Invalid PHPSESSID format rejected: prefix=%s, length=%d",
@@ -56,10 +63,4 @@ def sanitize_phpsessid(
             )
         return None
 
-    # Additional security: check for null bytes (shouldn't happen after regex, but defense in depth)
-    if "\x00" in session_id:
-        if logger:
-            logger.warning("PHPSESSID with null byte rejected")
-        return None
-
     return session_id
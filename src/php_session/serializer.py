@@ -0,0 +1,188 @@
+"""Session payload serializers.
+
+SessionManager turns session dicts into Redis payloads through a
+Serializer set on SessionConfig. The default, PHPSerializer, writes
+PHP's php_serialize format so PHP can read the same sessions.
+
+MsgPackSerializer writes msgpack instead, which PHP can read with the
+msgpack extension (session.serialize_handler = msgpack). It still reads
+PHP-serialized payloads, so existing sessions keep working while they
+are migrated.
+
+ZstdSerializer wraps another serializer and compresses large payloads
+with zstd, in the format phpredis uses for redis.session.compression.
+
+Install msgpack support with: pip install py-php-session[msgpack]
+Install zstd support with: pip install py-php-session[zstd]
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+from . import _phpser
+
+try:
+    import msgpack  # type: ignore[import-untyped]
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None  # type: ignore[assignment]
+
+# First byte of a msgpack map: fixmap (0x80-0x8f), map 16 or map 32.
+# PHP-serialized sessions start with "a:" instead.
+_MSGPACK_MAP_MARKERS = frozenset({*range(0x80, 0x90), 0xDE, 0xDF})
+
+# Magic number that starts every zstd frame; neither format above can
+# start with it
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class Serializer(Protocol):
+    """Converts session data to and from Redis payload bytes."""
+
+    def dumps(self, data: dict[str, Any]) -> bytes:
+        """Serialize session data to bytes."""
+        ...
+
+    def loads(self, raw: bytes) -> dict[str, Any]:
+        """Deserialize session data from bytes.
+
+        Raises:
+            ValueError: If the payload cannot be decoded.
+        """
+        ...
+
+
+@dataclass(frozen=True)
+class PHPSerializer:
+    """PHP php_serialize format, as written by PHP's redis session handler.
+
+    Example:
+        >>> PHPSerializer().dumps({"user_id": 1})
+        b'a:1:{s:7:"user_id";i:1;}'
+    """
+
+    def dumps(self, data: dict[str, Any]) -> bytes:
+        """Serialize session data to PHP-serialized bytes."""
+        return _phpser.dumps(data)
+
+    def loads(self, raw: bytes) -> dict[str, Any]:
+        """Deserialize PHP-serialized session data."""
+        data: dict[str, Any] = _phpser.loads(raw)
+        return data
+
+
+@dataclass(frozen=True)
+class MsgPackSerializer:
+    """msgpack format, with PHP-serialized payloads accepted on read.
+
+    Sessions written by this serializer are only readable by PHP if it
+    uses the msgpack extension's session.serialize_handler.
+
+    Example:
+        >>> config = SessionConfig(serializer=MsgPackSerializer())
+    """
+
+    def __post_init__(self) -> None:
+        """Check that msgpack is available.
+
+        Raises:
+            ImportError: If msgpack is not installed.
+        """
+        if msgpack is None:
+            raise ImportError(
+                "MsgPackSerializer requires msgpack: "
+                "pip install py-php-session[msgpack]"
+            )
+
+    def dumps(self, data: dict[str, Any]) -> bytes:
+        """Serialize session data to msgpack bytes."""
+        packed: bytes = msgpack.packb(data, use_bin_type=False)
+        return packed
+
+    def loads(self, raw: bytes) -> dict[str, Any]:
+        """Deserialize msgpack session data, or PHP-serialized legacy data.
+
+        Raises:
+            ValueError: If the payload cannot be decoded (msgpack's
+                        errors are ValueError subclasses).
+        """
+        data: dict[str, Any]
+        if raw[:1] and raw[0] in _MSGPACK_MAP_MARKERS:
+            # PHP arrays may have integer keys, which msgpack rejects by default
+            data = msgpack.unpackb(raw, raw=False, strict_map_key=False)
+        else:
+            data = _phpser.loads(raw)
+        return data
+
+
+@dataclass(frozen=True)
+class ZstdSerializer:
+    """Compresses payloads above a size threshold with zstd.
+
+    Wraps another serializer. Larger payloads are stored as a plain zstd
+    frame, which is what phpredis writes with redis.session.compression
+    set to zstd, so PHP configured that way can read them. Payloads up to
+    ``threshold`` bytes are stored uncompressed; both are read back.
+
+    Holds a zstd compressor and decompressor, so an instance must not be
+    used from several threads at once.
+
+    Attributes:
+        inner: Serializer producing the uncompressed payload.
+        threshold: Largest payload size in bytes stored uncompressed.
+        level: zstd compression level.
+
+    Example:
+        >>> config = SessionConfig(serializer=ZstdSerializer(threshold=1024))
+    """
+
+    inner: Serializer = field(default_factory=PHPSerializer)
+    threshold: int = 512
+    level: int = 3
+    _compressor: Any = field(init=False, repr=False, compare=False)
+    _decompressor: Any = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Check that zstandard is available and create the codecs.
+
+        Raises:
+            ImportError: If zstandard is not installed.
+            ValueError: If threshold is negative.
+        """
+        if zstandard is None:
+            raise ImportError(
+                "ZstdSerializer requires zstandard: pip install py-php-session[zstd]"
+            )
+        if self.threshold < 0:
+            raise ValueError("threshold cannot be negative")
+        object.__setattr__(
+            self, "_compressor", zstandard.ZstdCompressor(level=self.level)
+        )
+        object.__setattr__(self, "_decompressor", zstandard.ZstdDecompressor())
+
+    def dumps(self, data: dict[str, Any]) -> bytes:
+        """Serialize session data, compressing it above the threshold."""
+        payload = self.inner.dumps(data)
+        if len(payload) <= self.threshold:
+            return payload
+        compressed: bytes = self._compressor.compress(payload)
+        return compressed
+
+    def loads(self, raw: bytes) -> dict[str, Any]:
+        """Deserialize session data, decompressing zstd frames first.
+
+        Raises:
+            ValueError: If the payload cannot be decompressed or decoded.
+        """
+        if raw[:4] == _ZSTD_MAGIC:
+            try:
+                raw = self._decompressor.decompress(raw)
+            except zstandard.ZstdError as exc:
+                raise ValueError(f"invalid zstd payload: {exc}") from None
+        return self.inner.loads(raw)
@@ -2,12 +2,21 @@
 
 from __future__ import annotations
 
+import asyncio
 from typing import Any, Generator
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
+import phpserialize
 import pytest
 
-from php_session import SessionConfig, SessionManager, set_current_session_id
+from php_session import (
+    ACQUIRE_AND_LOAD_SHA,
+    SAVE_AND_RELEASE_SHA,
+    SET_KEY_SHA,
+    SessionConfig,
+    SessionManager,
+    bind_session_id,
+)
 
 
 @pytest.fixture
@@ -18,9 +27,55 @@ def mock_redis() -> AsyncMock:
     redis.set = AsyncMock(return_value=True)
     redis.delete = AsyncMock(return_value=1)
     redis.exists = AsyncMock(return_value=1)
-    # Mock the register_script method to return a callable
-    mock_script = AsyncMock(return_value=1)
-    redis.register_script = lambda script: mock_script
+    redis.expire = AsyncMock(return_value=True)
+
+    async def evalsha(sha: str, numkeys: int, *args: Any) -> Any:
+        # Emulate the fused scripts on top of the set/get mocks
+        keys, argv = args[:numkeys], args[numkeys:]
+        if sha == ACQUIRE_AND_LOAD_SHA:
+            if not await redis.set(keys[0], argv[0], nx=True, px=argv[1]):
+                return [0]
+            return [1, await redis.get(keys[1])]
+        if sha == SAVE_AND_RELEASE_SHA:
+            if argv[1]:
+                await redis.set(keys[0], argv[1], ex=argv[2])
+            else:
+                await redis.expire(keys[0], argv[2])
+        if sha == SET_KEY_SHA:
+            raw = await redis.get(keys[0])
+            try:
+                data = phpserialize.loads(raw, decode_strings=True) if raw else {}
+            except ValueError:
+                return 0
+            key = phpserialize.loads(argv[0], decode_strings=True)
+            data[key] = phpserialize.loads(argv[1], decode_strings=True)
+            await redis.set(keys[0], phpserialize.dumps(data), ex=argv[2])
+        return 1
+
+    redis.evalsha = AsyncMock(side_effect=evalsha)
+    redis.script_load = AsyncMock(return_value="sha")
+    # Lock release notifications: every subscription is answered with a
+    # release announcement on its channel
+    announcements: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+
+    async def subscribe(*channels: bytes) -> None:
+        for channel in channels:
+            announcements.put_nowait(
+                {"type": "message", "channel": channel, "data": b"1"}
+            )
+
+    async def get_message(
+        timeout: float | None = 0.0, **_kwargs: Any
+    ) -> dict[str, Any] | None:
+        try:
+            return await asyncio.wait_for(announcements.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    pubsub = AsyncMock()
+    pubsub.subscribe = AsyncMock(side_effect=subscribe)
+    pubsub.get_message = AsyncMock(side_effect=get_message)
+    redis.pubsub = MagicMock(return_value=pubsub)
     return redis
 
 
@@ -42,7 +97,7 @@ def session_manager(mock_redis: AsyncMock, config: SessionConfig) -> SessionMana
 @pytest.fixture(autouse=True)
 def setup_session_context() -> Generator[None, None, None]:
     """Set up and clean up session context for each test."""
-    # Use a valid 32-char session ID
-    set_current_session_id("a1b2c3d4e5f6g7h8i9j0k1l2m3n4o5p6")
-    yield
-    set_current_session_id(None)
+    # Use a valid 32-char session ID; leaving the block restores the
+    # previous value, including over any set made by the test itself
+    with bind_session_id("a1b2c3d4e5f6g7h8i9j0k1l2m3n4o5p6"):
+        yield
@@ -21,6 +21,11 @@ class TestSessionConfig:
         assert config.lock_suffix == "_LOCK"
         assert config.json_fields == DEFAULT_JSON_FIELDS
         assert config.json_prefix == "trace_list_"
+        assert config.decode_cache_size == 0
+        assert config.save_cache_size == 0
+        assert config.exists_cache_ttl == 0.0
+        assert config.track_changes is False
+        assert config.touch_on_read is False
 
     def test_custom_values(self) -> None:
         """Test that custom values can be set."""
@@ -56,6 +61,21 @@ class TestSessionConfig:
         with pytest.raises(ValueError, match="lock_timeout must be positive"):
             SessionConfig(lock_timeout=-1.0)
 
+    def test_invalid_decode_cache_size(self) -> None:
+        """Test that negative decode_cache_size raises ValueError."""
+        with pytest.raises(ValueError, match="decode_cache_size cannot be negative"):
+            SessionConfig(decode_cache_size=-1)
+
+    def test_invalid_save_cache_size(self) -> None:
+        """Test that negative save_cache_size raises ValueError."""
+        with pytest.raises(ValueError, match="save_cache_size cannot be negative"):
+            SessionConfig(save_cache_size=-1)
+
+    def test_invalid_exists_cache_ttl(self) -> None:
+        """Test that negative exists_cache_ttl raises ValueError."""
+        with pytest.raises(ValueError, match="exists_cache_ttl cannot be negative"):
+            SessionConfig(exists_cache_ttl=-1.0)
+
     def test_invalid_session_prefix(self) -> None:
         """Test that empty session_prefix raises ValueError."""
         with pytest.raises(ValueError, match="session_prefix cannot be empty"):
@@ -68,6 +88,14 @@ class TestSessionConfig:
         with pytest.raises(AttributeError):
             config.session_expire = 100  # type: ignore[misc]
 
+    def test_config_uses_slots(self) -> None:
+        """Test that config has no per-instance __dict__."""
+        config = SessionConfig()
+
+        assert not hasattr(config, "__dict__")
+        with pytest.raises((AttributeError, TypeError)):
+            config.unknown = 1  # type: ignore[attr-defined]
+
     def test_none_json_prefix(self) -> None:
         """Test that json_prefix can be None to disable prefix matching."""
         config = SessionConfig(json_prefix=None)
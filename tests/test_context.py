@@ -2,7 +2,14 @@
 
 from __future__ import annotations
 
-from php_session import get_current_session_id, set_current_session_id
+import pytest
+
+from php_session import (
+    bind_session_id,
+    get_current_session_id,
+    reset_current_session_id,
+    set_current_session_id,
+)
 
 
 class TestContextVars:
@@ -25,3 +32,34 @@ class TestContextVars:
 
         set_current_session_id("session_2_zyxwvutsrqponmlkjihgfedcba")
         assert get_current_session_id() == "session_2_zyxwvutsrqponmlkjihgfedcba"
+
+    def test_reset_restores_previous_session_id(self) -> None:
+        """Test that reset_current_session_id restores the prior value."""
+        before = get_current_session_id()
+        outer = set_current_session_id("outer_session_abcdefghijklmnopqr")
+        inner = set_current_session_id("inner_session_abcdefghijklmnopqr")
+
+        reset_current_session_id(inner)
+        assert get_current_session_id() == "outer_session_abcdefghijklmnopqr"
+
+        reset_current_session_id(outer)
+        assert get_current_session_id() == before
+
+    def test_bind_session_id_scopes_value(self) -> None:
+        """Test that bind_session_id restores the prior value on exit."""
+        before = get_current_session_id()
+
+        with bind_session_id("bound_session_abcdefghijklmnopqr") as session_id:
+            assert session_id == "bound_session_abcdefghijklmnopqr"
+            assert get_current_session_id() == session_id
+
+        assert get_current_session_id() == before
+
+    def test_bind_session_id_restores_on_error(self) -> None:
+        """Test that the prior value is restored when the block raises."""
+        before = get_current_session_id()
+
+        with pytest.raises(RuntimeError), bind_session_id("bound_session_abcdefghijklmnopqr"):
+            raise RuntimeError("boom")
+
+        assert get_current_session_id() == before
@@ -2,39 +2,81 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 from typing import Any
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import phpserialize
 import pytest
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import MaxConnectionsError, NoScriptError
 
 from php_session import (
+    ACQUIRE_AND_LOAD_SCRIPT,
+    ACQUIRE_AND_LOAD_SHA,
+    LOCK_RELEASE_CHANNEL_SUFFIX,
+    LOCK_RETRY_INTERVAL,
+    LOCK_RETRY_MAX_INTERVAL,
+    RELEASE_LOCK_SCRIPT,
+    RELEASE_LOCK_SHA,
+    SAVE_AND_RELEASE_SCRIPT,
+    SAVE_AND_RELEASE_SHA,
+    SET_KEY_SCRIPT,
+    SET_KEY_SHA,
     SessionConfig,
     SessionContextError,
     SessionLockError,
     SessionManager,
     set_current_session_id,
 )
-from php_session.decode import decode_json_fields
+from php_session.decode import (
+    decode_json_fields,
+    encode_json_fields,
+    make_json_field_decoder,
+)
+from php_session.manager import _ReleaseListener
+
+
+def release_calls(mock_redis: AsyncMock) -> list[Any]:
+    """Return the EVALSHA calls that ran the save + release script."""
+    return [
+        c for c in mock_redis.evalsha.call_args_list if c[0][0] == SAVE_AND_RELEASE_SHA
+    ]
 
 
 class TestSessionManagerInit:
     """Tests for SessionManager initialization."""
 
-    def test_init_registers_lua_script(self, mock_redis: AsyncMock) -> None:
-        """Test that __init__ registers the Lua release lock script."""
-        manager = SessionManager(mock_redis)
-        assert manager._release_lock_script is not None
+    def test_script_shas_match_scripts(self) -> None:
+        """Test that the precomputed script SHAs match the script bodies."""
+        for script, sha in (
+            (RELEASE_LOCK_SCRIPT, RELEASE_LOCK_SHA),
+            (SAVE_AND_RELEASE_SCRIPT, SAVE_AND_RELEASE_SHA),
+            (ACQUIRE_AND_LOAD_SCRIPT, ACQUIRE_AND_LOAD_SHA),
+            (SET_KEY_SCRIPT, SET_KEY_SHA),
+        ):
+            assert hashlib.sha1(script.encode()).hexdigest() == sha
 
     def test_session_key_format(self, session_manager: SessionManager) -> None:
         """Test that session key follows PHP format."""
         key = session_manager._session_key("abc123")
-        assert key == "PHPREDIS_SESSION:abc123"
+        assert key == b"PHPREDIS_SESSION:abc123"
+
+    def test_custom_key_format(self, mock_redis: AsyncMock) -> None:
+        """Test that keys honour a custom prefix and lock suffix."""
+        config = SessionConfig(session_prefix="APP:", lock_suffix=".lock")
+        manager = SessionManager(mock_redis, config)
+
+        assert manager._session_key("abc123") == b"APP:abc123"
+        assert manager._lock_key("abc123") == b"APP:abc123.lock"
 
     def test_lock_key_format(self, session_manager: SessionManager) -> None:
         """Test that lock key follows PHP format with _LOCK suffix."""
         key = session_manager._lock_key("abc123")
-        assert key == "PHPREDIS_SESSION:abc123_LOCK"
+        assert key == b"PHPREDIS_SESSION:abc123_LOCK"
 
 
 class TestSessionManagerGet:
@@ -76,6 +118,20 @@ class TestSessionManagerGet:
 
         assert result == 5
 
+    @pytest.mark.asyncio
+    async def test_get_key_decodes_only_that_entry(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test get(key) skips decoding the rest of the session."""
+        session_data: dict[str, Any] = {"user_id": 123, "scart_items": "[1,2]"}
+        mock_redis.get.return_value = phpserialize.dumps(session_data)
+
+        with patch.object(session_manager, "_decode_session") as decode:
+            result = await session_manager.get("scart_items")
+
+        assert result == [1, 2]
+        decode.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_get_returns_none_for_missing_key(
         self, session_manager: SessionManager, mock_redis: AsyncMock
@@ -112,6 +168,341 @@ class TestSessionManagerGet:
         assert result == session_data
 
 
+class TestSessionManagerTouchOnRead:
+    """Tests for refreshing the session expiry on reads."""
+
+    @pytest.fixture
+    def touching_manager(self, mock_redis: AsyncMock) -> SessionManager:
+        """Session manager with touch_on_read enabled."""
+        return SessionManager(
+            mock_redis, SessionConfig(session_expire=600, touch_on_read=True)
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_reads_with_getex(
+        self, touching_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test get() reads and refreshes the expiry in one GETEX."""
+        mock_redis.getex.return_value = phpserialize.dumps({"cart_count": 5})
+
+        assert await touching_manager.get("cart_count") == 5
+        assert await touching_manager.get_many(["cart_count"]) == {"cart_count": 5}
+
+        mock_redis.getex.assert_called_with(
+            b"PHPREDIS_SESSION:a1b2c3d4e5f6g7h8i9j0k1l2m3n4o5p6", ex=600
+        )
+        assert mock_redis.getex.call_count == 2
+        mock_redis.get.assert_not_called()
+        mock_redis.expire.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_without_touch_uses_plain_get(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test get() leaves the expiry alone by default."""
+        await session_manager.get()
+
+        mock_redis.get.assert_called_once()
+        mock_redis.getex.assert_not_called()
+
+
+class TestSessionManagerGetStruct:
+    """Tests for typed session reads with msgspec."""
+
+    @pytest.fixture(autouse=True)
+    def require_msgspec(self) -> None:
+        """Skip when the optional msgspec dependency is missing."""
+        pytest.importorskip("msgspec")
+
+    @pytest.mark.asyncio
+    async def test_php_session_converted_to_struct(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test PHP sessions are decoded, JSON fields included, then converted."""
+        import msgspec
+
+        class Cart(msgspec.Struct):
+            cart_count: int
+            scart_items: list[int] = []
+
+        mock_redis.get.return_value = phpserialize.dumps(
+            {"user_id": 1, "cart_count": 2, "scart_items": "[1,2]"}
+        )
+
+        assert await session_manager.get_struct(Cart) == Cart(2, [1, 2])
+
+    @pytest.mark.asyncio
+    async def test_msgpack_session_decoded_directly(
+        self, mock_redis: AsyncMock
+    ) -> None:
+        """Test msgpack payloads go straight into the struct."""
+        import msgspec
+
+        msgpack = pytest.importorskip("msgpack")
+        from php_session import MsgPackSerializer
+
+        class User(msgspec.Struct):
+            user_id: int
+
+        manager = SessionManager(
+            mock_redis, SessionConfig(serializer=MsgPackSerializer())
+        )
+        mock_redis.get.return_value = msgpack.packb({"user_id": 7, "x": {1: "a"}})
+
+        with patch.object(manager, "_decode_session") as decode:
+            assert await manager.get_struct(User) == User(7)
+        decode.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_missing_session_returns_none(
+        self, session_manager: SessionManager
+    ) -> None:
+        """Test get_struct() returns None when the session doesn't exist."""
+        import msgspec
+
+        assert await session_manager.get_struct(msgspec.Struct) is None
+
+    @pytest.mark.asyncio
+    async def test_mismatched_session_raises_value_error(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test validation errors surface as ValueError."""
+        import msgspec
+
+        class User(msgspec.Struct):
+            user_id: int
+
+        mock_redis.get.return_value = phpserialize.dumps({"user_id": "abc"})
+
+        with pytest.raises(ValueError):
+            await session_manager.get_struct(User)
+
+
+class TestSessionManagerSerializer:
+    """Tests for the configurable session serializer."""
+
+    @pytest.mark.asyncio
+    async def test_custom_serializer_used_for_reads_and_writes(
+        self, mock_redis: AsyncMock
+    ) -> None:
+        """Test get() and lock() go through SessionConfig.serializer."""
+
+        class JSONSerializer:
+            def dumps(self, data: dict[str, Any]) -> bytes:
+                return json.dumps(data).encode()
+
+            def loads(self, raw: bytes) -> dict[str, Any]:
+                result: dict[str, Any] = json.loads(raw)
+                return result
+
+        manager = SessionManager(
+            mock_redis, SessionConfig(serializer=JSONSerializer())
+        )
+        mock_redis.get.return_value = b'{"cart_count": 1, "scart_items": "[1]"}'
+
+        assert await manager.get("scart_items") == [1]
+        async with manager.lock() as session:
+            session["cart_count"] = 2
+
+        save_call = mock_redis.set.call_args_list[-1]
+        assert json.loads(save_call[0][1]) == {"cart_count": 2, "scart_items": "[1]"}
+
+    @pytest.mark.asyncio
+    async def test_msgpack_serializer_migrates_php_sessions(
+        self, mock_redis: AsyncMock
+    ) -> None:
+        """Test a PHP-serialized session is rewritten as msgpack on save."""
+        msgpack = pytest.importorskip("msgpack")
+        from php_session import MsgPackSerializer
+
+        manager = SessionManager(
+            mock_redis, SessionConfig(serializer=MsgPackSerializer())
+        )
+        mock_redis.get.return_value = phpserialize.dumps({"user_id": 1})
+
+        async with manager.lock() as session:
+            assert session == {"user_id": 1}
+
+        save_call = mock_redis.set.call_args_list[-1]
+        assert msgpack.unpackb(save_call[0][1]) == {"user_id": 1}
+
+    @pytest.mark.asyncio
+    async def test_zstd_serializer_compresses_large_sessions(
+        self, mock_redis: AsyncMock
+    ) -> None:
+        """Test large sessions are written compressed and read back."""
+        pytest.importorskip("zstandard")
+        from php_session import ZstdSerializer
+
+        manager = SessionManager(
+            mock_redis, SessionConfig(serializer=ZstdSerializer(threshold=64))
+        )
+        mock_redis.get.return_value = phpserialize.dumps({"user_id": 1})
+
+        await manager.set("trace_list_views", ["page"] * 100)
+
+        raw = mock_redis.set.call_args[0][1]
+        assert raw[:4] == b"\x28\xb5\x2f\xfd"
+        mock_redis.get.return_value = raw
+        assert await manager.get("trace_list_views") == ["page"] * 100
+
+
+class TestSessionManagerBulkReads:
+    """Tests for SessionManager.get_many() and mget_sessions()."""
+
+    @pytest.mark.asyncio
+    async def test_get_many_reads_and_decodes_once(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test get_many() returns several keys from one read."""
+        mock_redis.get.return_value = phpserialize.dumps(
+            {"user_id": 123, "cart_count": 5, "scart_items": '["a"]'}
+        )
+
+        result = await session_manager.get_many(
+            ["user_id", "scart_items", "missing"]
+        )
+
+        assert result == {"user_id": 123, "scart_items": ["a"], "missing": None}
+        mock_redis.get.assert_called_once_with(
+            b"PHPREDIS_SESSION:a1b2c3d4e5f6g7h8i9j0k1l2m3n4o5p6"
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_many_missing_session(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test get_many() maps every key to None when the session is missing."""
+        mock_redis.get.return_value = None
+
+        result = await session_manager.get_many(["user_id", "cart_count"])
+
+        assert result == {"user_id": None, "cart_count": None}
+
+    @pytest.mark.asyncio
+    async def test_mget_sessions_single_round_trip(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test mget_sessions() issues one MGET and omits missing sessions."""
+        mock_redis.mget = AsyncMock(
+            return_value=[
+                phpserialize.dumps({"user_id": 1}),
+                None,
+                phpserialize.dumps({"user_id": 3, "ga_data": '{"e": 1}'}),
+            ]
+        )
+        ids = ["a" * 32, "b" * 32, "c" * 32]
+
+        result = await session_manager.mget_sessions(ids)
+
+        mock_redis.mget.assert_called_once_with(
+            [b"PHPREDIS_SESSION:" + sid.encode() for sid in ids]
+        )
+        assert result == {
+            "a" * 32: {"user_id": 1},
+            "c" * 32: {"user_id": 3, "ga_data": {"e": 1}},
+        }
+
+    @pytest.mark.asyncio
+    async def test_mget_sessions_empty(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test mget_sessions() skips Redis when no IDs are given."""
+        mock_redis.mget = AsyncMock()
+
+        assert await session_manager.mget_sessions([]) == {}
+        mock_redis.mget.assert_not_called()
+
+
+class TestSessionManagerDecodeCache:
+    """Tests for the opt-in decoded session cache used by get()."""
+
+    @pytest.fixture
+    def cached_manager(self, mock_redis: AsyncMock) -> SessionManager:
+        """Session manager with a small decode cache."""
+        return SessionManager(mock_redis, SessionConfig(decode_cache_size=2))
+
+    @pytest.mark.asyncio
+    async def test_cache_disabled_by_default(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test get() decodes every time without decode_cache_size."""
+        mock_redis.get.return_value = phpserialize.dumps({"user_id": 1})
+
+        first = await session_manager.get()
+        second = await session_manager.get()
+
+        assert first == second
+        assert first is not second
+        assert not session_manager._decode_cache
+
+    @pytest.mark.asyncio
+    async def test_unchanged_payload_reuses_decoded_data(
+        self, cached_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test repeated get() calls skip decoding while raw is unchanged."""
+        mock_redis.get.return_value = phpserialize.dumps({"user_id": 1})
+
+        with patch.object(
+            cached_manager, "_decode_session", wraps=cached_manager._decode_session
+        ) as decode:
+            first = await cached_manager.get()
+            second = await cached_manager.get("user_id")
+
+        assert first == {"user_id": 1}
+        assert second == 1
+        decode.assert_called_once()
+        # Every call still reads Redis, so changes by other writers are seen
+        assert mock_redis.get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_changed_payload_is_decoded_again(
+        self, cached_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test a different raw payload replaces the cached result."""
+        mock_redis.get.return_value = phpserialize.dumps({"user_id": 1})
+        await cached_manager.get()
+
+        mock_redis.get.return_value = phpserialize.dumps({"user_id": 2})
+        result = await cached_manager.get()
+
+        assert result == {"user_id": 2}
+
+    @pytest.mark.asyncio
+    async def test_cache_evicts_least_recently_used(
+        self, cached_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test the cache stays within decode_cache_size."""
+        mock_redis.get.return_value = phpserialize.dumps({"user_id": 1})
+
+        for sid in ("a" * 32, "b" * 32, "a" * 32, "c" * 32):
+            await cached_manager.get(session_id=sid)
+
+        assert list(cached_manager._decode_cache) == ["a" * 32, "c" * 32]
+
+    @pytest.mark.asyncio
+    async def test_writes_invalidate_cache(
+        self, cached_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test set(), save(), delete() and lock() drop the cached entry."""
+        sid = "test_session_id_12345678901234567890"
+        mock_redis.get.return_value = phpserialize.dumps({"user_id": 1})
+
+        for write in (
+            cached_manager.set("k", "v", session_id=sid),
+            cached_manager.save({"k": "v"}, session_id=sid),
+            cached_manager.delete(session_id=sid),
+        ):
+            await cached_manager.get(session_id=sid)
+            assert sid in cached_manager._decode_cache
+            await write
+            assert sid not in cached_manager._decode_cache
+
+        await cached_manager.get(session_id=sid)
+        async with cached_manager.lock(session_id=sid):
+            assert sid not in cached_manager._decode_cache
+
+
 class TestSessionManagerSet:
     """Tests for SessionManager.set() method."""
 
@@ -157,7 +548,83 @@ class TestSessionManagerSet:
 
         call_args = mock_redis.set.call_args
         assert call_args is not None
-        assert "explicit_id_1234567890123456" in call_args[0][0]
+        assert b"explicit_id_1234567890123456" in call_args[0][0]
+
+
+    @pytest.mark.asyncio
+    async def test_set_keeps_json_fields_as_json(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test set() writes untouched JSON fields back as JSON strings."""
+        existing_data: dict[str, Any] = {"scart_items": '["item1","item2"]'}
+        mock_redis.get.return_value = phpserialize.dumps(existing_data)
+
+        await session_manager.set("cart_count", 2)
+
+        call_args = mock_redis.set.call_args
+        assert call_args is not None
+        saved_data = phpserialize.loads(call_args[0][1], decode_strings=True)
+        assert saved_data == {"scart_items": '["item1","item2"]', "cart_count": 2}
+
+    @pytest.mark.asyncio
+    async def test_set_patches_key_in_one_script_call(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test set() sends only the serialized key and value to the script."""
+        await session_manager.set("scart_items", ["item1"])
+
+        mock_redis.evalsha.assert_called_once_with(
+            SET_KEY_SHA,
+            1,
+            b"PHPREDIS_SESSION:a1b2c3d4e5f6g7h8i9j0k1l2m3n4o5p6",
+            b's:11:"scart_items";',
+            b's:9:"["item1"]";',
+            3600,
+        )
+
+    @pytest.mark.asyncio
+    async def test_set_undecodable_session_raises_without_writing(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test set() falls back to decoding in Python, which rejects junk.
+
+        The script can't patch the payload, and neither can the Python
+        fallback, so nothing is written. A payload that only the script
+        rejects is rewritten from Python (see TestLuaScripts).
+        """
+        mock_redis.get.return_value = b"not a session"
+
+        with pytest.raises(ValueError):
+            await session_manager.set("cart_count", 1)
+
+        mock_redis.set.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_set_with_other_serializer_rewrites_session(
+        self, mock_redis: AsyncMock
+    ) -> None:
+        """Test set() reads and rewrites sessions it can't patch in Lua."""
+
+        class JSONSerializer:
+            def dumps(self, data: dict[str, Any]) -> bytes:
+                return json.dumps(data).encode()
+
+            def loads(self, raw: bytes) -> dict[str, Any]:
+                result: dict[str, Any] = json.loads(raw)
+                return result
+
+        manager = SessionManager(
+            mock_redis, SessionConfig(serializer=JSONSerializer())
+        )
+        mock_redis.get.return_value = b'{"user_id": 1}'
+
+        await manager.set("cart_count", 2)
+
+        mock_redis.evalsha.assert_not_called()
+        assert json.loads(mock_redis.set.call_args[0][1]) == {
+            "user_id": 1,
+            "cart_count": 2,
+        }
 
 
 class TestSessionManagerSave:
@@ -177,6 +644,99 @@ class TestSessionManagerSave:
         saved_data = phpserialize.loads(call_args[0][1], decode_strings=True)
         assert saved_data == new_data
 
+    @pytest.mark.asyncio
+    async def test_save_with_int_keys(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test save() handles PHP's int top-level keys next to the JSON prefix."""
+        new_data: dict[Any, Any] = {0: [1, 2], "a": 1}
+
+        await session_manager.save(new_data)
+
+        saved = mock_redis.set.call_args[0][1]
+        assert phpserialize.loads(saved, decode_strings=True) == {
+            0: {0: 1, 1: 2},
+            "a": 1,
+        }
+
+    @pytest.mark.asyncio
+    async def test_save_always_writes_by_default(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test repeated identical saves are all written without save_cache_size."""
+        await session_manager.save({"user_id": 1})
+        await session_manager.save({"user_id": 1})
+
+        assert mock_redis.set.call_count == 2
+        mock_redis.expire.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_identical_save_only_refreshes_expiry(
+        self, mock_redis: AsyncMock
+    ) -> None:
+        """Test save_cache_size turns a repeated identical save into EXPIRE."""
+        manager = SessionManager(mock_redis, SessionConfig(save_cache_size=8))
+
+        await manager.save({"user_id": 1})
+        await manager.save({"user_id": 1})
+        await manager.save({"user_id": 2})
+
+        assert mock_redis.set.call_count == 2
+        mock_redis.expire.assert_called_once_with(
+            b"PHPREDIS_SESSION:a1b2c3d4e5f6g7h8i9j0k1l2m3n4o5p6", 86400
+        )
+
+    @pytest.mark.asyncio
+    async def test_identical_save_rewrites_missing_session(
+        self, mock_redis: AsyncMock
+    ) -> None:
+        """Test a cached save() still writes if the key is gone from Redis."""
+        manager = SessionManager(mock_redis, SessionConfig(save_cache_size=8))
+        await manager.save({"user_id": 1})
+        # Expired, evicted or deleted by another worker: EXPIRE finds no key
+        mock_redis.expire.return_value = False
+
+        await manager.save({"user_id": 1})
+
+        mock_redis.expire.assert_called_once()
+        assert mock_redis.set.call_count == 2
+        assert mock_redis.set.call_args[0][1] == phpserialize.dumps({"user_id": 1})
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("change", ["set", "delete", "lock"])
+    async def test_other_writes_invalidate_save_cache(
+        self, mock_redis: AsyncMock, change: str
+    ) -> None:
+        """Test set(), delete() and lock() make the next save() write again."""
+        manager = SessionManager(mock_redis, SessionConfig(save_cache_size=8))
+        await manager.save({"user_id": 1})
+
+        if change == "set":
+            await manager.set("cart_count", 1)
+        elif change == "delete":
+            await manager.delete()
+        else:
+            async with manager.lock():
+                pass
+        mock_redis.set.reset_mock()
+        await manager.save({"user_id": 1})
+
+        mock_redis.set.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_save_cache_evicts_least_recently_used(
+        self, mock_redis: AsyncMock
+    ) -> None:
+        """Test only save_cache_size sessions are remembered."""
+        manager = SessionManager(mock_redis, SessionConfig(save_cache_size=1))
+
+        await manager.save({"user_id": 1}, session_id="a" * 32)
+        await manager.save({"user_id": 1}, session_id="b" * 32)
+        await manager.save({"user_id": 1}, session_id="a" * 32)
+
+        assert mock_redis.set.call_count == 3
+        assert list(manager._save_cache) == ["a" * 32]
+
 
 class TestSessionManagerLock:
     """Tests for SessionManager.lock() context manager."""
@@ -198,7 +758,7 @@ class TestSessionManagerLock:
         assert "px" in lock_call[1]
 
         # Verify Lua script was called to release lock
-        session_manager._release_lock_script.assert_called_once()
+        assert len(release_calls(mock_redis)) == 1
 
     @pytest.mark.asyncio
     async def test_lock_loads_existing_session(
@@ -236,6 +796,129 @@ class TestSessionManagerLock:
         assert saved_data["cart_count"] == 99
         assert saved_data["new_field"] == "hello"
 
+    @pytest.mark.asyncio
+    async def test_lock_saves_session_with_int_keys(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test lock() saves sessions that have int top-level keys."""
+        mock_redis.get.return_value = phpserialize.dumps({0: "x", "a": 1})
+
+        async with session_manager.lock() as session:
+            session[0] = [1, 2]
+
+        saved = release_calls(mock_redis)[0][0][5]
+        assert phpserialize.loads(saved, decode_strings=True) == {
+            0: {0: 1, 1: 2},
+            "a": 1,
+        }
+
+    @pytest.mark.asyncio
+    async def test_lock_released_when_session_cannot_be_encoded(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test the lock is released, not left to expire, if encoding fails."""
+        with pytest.raises(TypeError):
+            async with session_manager.lock() as session:
+                session["bad"] = object()
+
+        shas = [c[0][0] for c in mock_redis.evalsha.call_args_list]
+        assert shas == [ACQUIRE_AND_LOAD_SHA, RELEASE_LOCK_SHA]
+        assert mock_redis.evalsha.call_args[0][3] == mock_redis.set.call_args[0][1]
+
+    @pytest.mark.asyncio
+    async def test_lock_unchanged_session_only_refreshes_expiry(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test lock() skips rewriting a session that was only read."""
+        mock_redis.get.return_value = phpserialize.dumps(
+            {"cart_count": 1, "scart_items": "[1,2]"}
+        )
+
+        async with session_manager.lock() as session:
+            assert session["scart_items"] == [1, 2]
+
+        save_calls = [c for c in mock_redis.set.call_args_list if "ex" in c[1]]
+        assert save_calls == []
+        mock_redis.expire.assert_called_once_with(
+            b"PHPREDIS_SESSION:a1b2c3d4e5f6g7h8i9j0k1l2m3n4o5p6", 3600
+        )
+        assert len(release_calls(mock_redis)) == 1
+
+    @pytest.mark.asyncio
+    async def test_lock_nested_change_is_saved(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test lock() detects changes inside nested values."""
+        mock_redis.get.return_value = phpserialize.dumps({"prefs": {"a": 1}})
+
+        async with session_manager.lock() as session:
+            session["prefs"]["a"] = 2
+
+        save_call = mock_redis.set.call_args_list[-1]
+        saved_data = phpserialize.loads(save_call[0][1], decode_strings=True)
+        assert saved_data == {"prefs": {"a": 2}}
+        mock_redis.expire.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_lock_track_changes_skips_encoding_untouched_session(
+        self, mock_redis: AsyncMock
+    ) -> None:
+        """Test track_changes avoids encoding a session whose keys weren't set."""
+        manager = SessionManager(mock_redis, SessionConfig(track_changes=True))
+        mock_redis.get.return_value = phpserialize.dumps({"cart_count": 1})
+
+        with patch.object(manager, "_encode_session") as encode:
+            async with manager.lock() as session:
+                assert session["cart_count"] == 1
+
+        encode.assert_not_called()
+        mock_redis.expire.assert_called_once()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "mutate",
+        [
+            lambda s: s.__setitem__("cart_count", 2),
+            lambda s: s.__delitem__("cart_count"),
+            lambda s: s.update(cart_count=2),
+            lambda s: s.pop("cart_count"),
+            lambda s: s.popitem(),
+            lambda s: s.setdefault("new", 1),
+            lambda s: s.clear(),
+        ],
+    )
+    async def test_lock_track_changes_saves_mutated_session(
+        self, mock_redis: AsyncMock, mutate: Any
+    ) -> None:
+        """Test track_changes still saves after any top-level mutation."""
+        manager = SessionManager(mock_redis, SessionConfig(track_changes=True))
+        mock_redis.get.return_value = phpserialize.dumps({"cart_count": 1})
+
+        async with manager.lock() as session:
+            mutate(session)
+
+        save_calls = [c for c in mock_redis.set.call_args_list if "ex" in c[1]]
+        assert len(save_calls) == 1
+        mock_redis.expire.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_lock_saves_json_fields_as_json(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test lock() re-encodes decoded JSON fields when saving."""
+        initial_data: dict[str, Any] = {"scart_items": "[1]"}
+        mock_redis.get.return_value = phpserialize.dumps(initial_data)
+
+        async with session_manager.lock() as session:
+            assert session["scart_items"] == [1]
+            session["scart_items"].append(2)
+            session["trace_list_views"] = {"a": 1}
+
+        save_call = mock_redis.set.call_args_list[-1]
+        saved_data = phpserialize.loads(save_call[0][1], decode_strings=True)
+        assert saved_data["scart_items"] == "[1,2]"
+        assert saved_data["trace_list_views"] == '{"a":1}'
+
     @pytest.mark.asyncio
     async def test_lock_uses_unique_token(
         self, session_manager: SessionManager, mock_redis: AsyncMock
@@ -261,6 +944,21 @@ class TestSessionManagerLock:
         # Tokens should be hex strings (32 chars for 16 bytes)
         assert len(tokens[0]) == 32
         assert len(tokens[1]) == 32
+        int(tokens[0], 16)
+
+    def test_lock_tokens_reseeded_after_fork(self) -> None:
+        """Test a forked child gets a token sequence distinct from its parent."""
+        from php_session import manager as manager_module
+
+        parent_token = manager_module._new_lock_token()
+        with patch.object(manager_module, "_token_prefix"), patch.object(
+            manager_module, "_token_counter"
+        ):
+            manager_module._reseed_lock_tokens()
+            child_token = manager_module._new_lock_token()
+
+        assert child_token[:16] != parent_token[:16]
+        assert child_token[16:] == f"{0:016x}"
 
     @pytest.mark.asyncio
     async def test_lock_timeout_raises_error(
@@ -289,7 +987,7 @@ class TestSessionManagerLock:
                 raise ValueError("Test error")
 
         # Lock should still be released via Lua script
-        session_manager._release_lock_script.assert_called_once()
+        assert len(release_calls(mock_redis)) == 1
 
     @pytest.mark.asyncio
     async def test_lock_retries_on_contention(
@@ -309,6 +1007,266 @@ class TestSessionManagerLock:
         # Should have tried 3 times for lock + 1 for session save
         assert mock_redis.set.call_count == 4
 
+    @pytest.mark.asyncio
+    async def test_lock_acquires_and_loads_in_one_script(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test lock() acquires and loads via one script, saves+releases via another."""
+        mock_redis.set.return_value = True
+        mock_redis.get.return_value = phpserialize.dumps({"cart_count": 1})
+
+        async with session_manager.lock() as session:
+            assert session["cart_count"] == 1
+
+        acquire_call = mock_redis.evalsha.call_args_list[0]
+        assert acquire_call[0][0] == ACQUIRE_AND_LOAD_SHA
+        assert acquire_call[0][1] == 2
+        save_call = mock_redis.evalsha.call_args_list[1]
+        assert save_call[0][:4] == (
+            SAVE_AND_RELEASE_SHA,
+            2,
+            b"PHPREDIS_SESSION:a1b2c3d4e5f6g7h8i9j0k1l2m3n4o5p6",
+            b"PHPREDIS_SESSION:a1b2c3d4e5f6g7h8i9j0k1l2m3n4o5p6_LOCK",
+        )
+        assert save_call[0][6] == 3600
+        # Two scripts in total, no pipeline and no pinned client
+        assert mock_redis.evalsha.call_count == 2
+        mock_redis.pipeline.assert_not_called()
+        mock_redis.client.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_lock_acquire_loads_missing_script(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test lock() loads the acquire script when Redis reports NOSCRIPT."""
+        emulate = mock_redis.evalsha.side_effect
+        missing = {ACQUIRE_AND_LOAD_SHA}
+
+        async def evalsha(sha: str, numkeys: int, *args: Any) -> Any:
+            if sha in missing:
+                raise NoScriptError("No matching script")
+            return await emulate(sha, numkeys, *args)
+
+        async def script_load(_script: str) -> str:
+            missing.clear()
+            return ACQUIRE_AND_LOAD_SHA
+
+        mock_redis.evalsha.side_effect = evalsha
+        mock_redis.script_load.side_effect = script_load
+
+        async with session_manager.lock():
+            pass
+
+        mock_redis.script_load.assert_called_once_with(ACQUIRE_AND_LOAD_SCRIPT)
+
+    @pytest.mark.asyncio
+    async def test_lock_release_falls_back_on_noscript(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test lock() reloads the save + release script when Redis lost it."""
+        mock_redis.set.return_value = True
+        mock_redis.get.return_value = None
+        emulate = mock_redis.evalsha.side_effect
+        missing = {SAVE_AND_RELEASE_SHA}
+
+        async def evalsha(sha: str, numkeys: int, *args: Any) -> Any:
+            if sha in missing:
+                raise NoScriptError("No matching script")
+            return await emulate(sha, numkeys, *args)
+
+        async def script_load(_script: str) -> str:
+            missing.clear()
+            return SAVE_AND_RELEASE_SHA
+
+        mock_redis.evalsha.side_effect = evalsha
+        mock_redis.script_load.side_effect = script_load
+
+        async with session_manager.lock():
+            pass
+
+        mock_redis.script_load.assert_called_once_with(SAVE_AND_RELEASE_SCRIPT)
+        assert len(release_calls(mock_redis)) == 2
+        # NOSCRIPT aborts the whole script, so the session is saved only once
+        save_calls = [c for c in mock_redis.set.call_args_list if "ex" in c[1]]
+        assert len(save_calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_lock_retry_backoff_grows_and_is_capped(
+        self, mock_redis: AsyncMock
+    ) -> None:
+        """Test lock() backs off exponentially with jitter, up to the cap."""
+        mock_redis.set.side_effect = [False] * 9 + [True, True]
+        mock_redis.get.return_value = None
+        delays: list[float] = []
+
+        async def fake_wait(_released: Any, timeout: float) -> None:
+            delays.append(timeout)
+
+        manager = SessionManager(mock_redis, SessionConfig(lock_timeout=10.0))
+        with patch.object(SessionManager, "_wait_for_release", staticmethod(fake_wait)):
+            async with manager.lock():
+                pass
+
+        # The first retry happens right after subscribing, without waiting
+        assert len(delays) == 8
+        for attempt, delay in enumerate(delays):
+            base = min(LOCK_RETRY_INTERVAL * 2**attempt, LOCK_RETRY_MAX_INTERVAL)
+            assert base * 0.5 <= delay <= base * 1.5
+
+    @pytest.mark.asyncio
+    async def test_lock_wait_never_passes_deadline(
+        self, mock_redis: AsyncMock
+    ) -> None:
+        """Test backoff waits are clamped to the time left before lock_timeout."""
+        mock_redis.set.return_value = False
+        delays: list[float] = []
+
+        async def fake_wait(_released: Any, timeout: float) -> None:
+            delays.append(timeout)
+            await asyncio.sleep(timeout)
+
+        manager = SessionManager(mock_redis, SessionConfig(lock_timeout=0.08))
+        with (
+            patch.object(SessionManager, "_wait_for_release", staticmethod(fake_wait)),
+            pytest.raises(SessionLockError),
+        ):
+            async with manager.lock():
+                pass
+
+        assert delays
+        assert all(delay <= 0.08 for delay in delays)
+        # The later backoff (>= 0.05s nominal) is cut to what remains
+        assert sum(delays) <= 0.08 + 0.01
+
+    @pytest.mark.asyncio
+    async def test_lock_lost_before_save_logs_warning(
+        self, mock_redis: AsyncMock
+    ) -> None:
+        """Test a warning is logged when the script finds the lock gone."""
+        logger = MagicMock()
+        manager = SessionManager(mock_redis, SessionConfig(), logger)
+        acquire = mock_redis.evalsha.side_effect
+
+        async def evalsha(sha: str, numkeys: int, *args: Any) -> Any:
+            if sha == SAVE_AND_RELEASE_SHA:
+                return 0  # token no longer matches: nothing written
+            return await acquire(sha, numkeys, *args)
+
+        mock_redis.evalsha.side_effect = evalsha
+
+        async with manager.lock() as session:
+            session["cart_count"] = 1
+
+        logger.warning.assert_called_once()
+        assert "expired" in logger.warning.call_args[0][0]
+
+    @pytest.mark.asyncio
+    async def test_slow_acquire_past_deadline_is_kept(
+        self, mock_redis: AsyncMock
+    ) -> None:
+        """Test an acquire that completes after lock_timeout is not abandoned.
+
+        Cancelling the script mid-flight could leave a lock held in Redis
+        that nobody releases, so the deadline is only checked between tries.
+        """
+
+        async def slow_set(*_args: Any, **_kwargs: Any) -> bool:
+            await asyncio.sleep(0.05)
+            return True
+
+        mock_redis.set.side_effect = slow_set
+        manager = SessionManager(mock_redis, SessionConfig(lock_timeout=0.01))
+
+        async with manager.lock() as session:
+            session["cart_count"] = 1
+
+        assert len(release_calls(mock_redis)) == 1
+
+    @pytest.mark.asyncio
+    async def test_lock_waits_for_release_notification(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test lock() subscribes to the release channel while contended."""
+        mock_redis.set.side_effect = [False, False, True, True]
+        mock_redis.get.return_value = None
+        pubsub = mock_redis.pubsub.return_value
+
+        async with session_manager.lock():
+            pass
+
+        pubsub.subscribe.assert_called_once_with(
+            session_manager._lock_key("a1b2c3d4e5f6g7h8i9j0k1l2m3n4o5p6")
+            + LOCK_RELEASE_CHANNEL_SUFFIX.encode()
+        )
+        pubsub.get_message.assert_awaited()
+        pubsub.aclose.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_contended_waiters_share_one_subscription(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test concurrent waiters use one pub/sub connection, closed after."""
+        mock_redis.set.side_effect = [False, False, False, False, True, True] * 2
+
+        async def waiter() -> None:
+            async with session_manager.lock():
+                await asyncio.sleep(0)
+
+        await asyncio.gather(waiter(), waiter())
+
+        mock_redis.pubsub.assert_called_once()
+        mock_redis.pubsub.return_value.subscribe.assert_called_once()
+        mock_redis.pubsub.return_value.aclose.assert_called_once()
+        assert session_manager._release_listener._waiters == {}
+
+    @pytest.mark.asyncio
+    async def test_lock_polls_when_no_connection_for_listening(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test lock() falls back to backoff polling if it can't subscribe."""
+        mock_redis.set.side_effect = [False, False, True, True]
+        pubsub = mock_redis.pubsub.return_value
+        pubsub.subscribe.side_effect = MaxConnectionsError("Too many connections")
+
+        async with session_manager.lock():
+            pass
+
+        pubsub.get_message.assert_not_called()
+        pubsub.aclose.assert_called_once()
+        assert mock_redis.set.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_listener_cleanup_error_does_not_escape_lock(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test a failed unsubscribe still saves and releases the lock."""
+        mock_redis.set.side_effect = [False, False, True, True]
+        mock_redis.get.return_value = None
+        pubsub = mock_redis.pubsub.return_value
+        pubsub.aclose.side_effect = RedisConnectionError("Connection reset")
+
+        async with session_manager.lock() as session:
+            session["a"] = 1
+
+        assert mock_redis.evalsha.call_args[0][0] == SAVE_AND_RELEASE_SHA
+        assert session_manager._release_listener._waiters == {}
+
+    @pytest.mark.asyncio
+    async def test_lock_without_contention_skips_pubsub(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test lock() does not subscribe when the lock is free."""
+        async with session_manager.lock():
+            pass
+
+        mock_redis.pubsub.assert_not_called()
+
+    def test_release_script_announces_release(self) -> None:
+        """Test the release scripts publish on the lock's release channel."""
+        for script in (RELEASE_LOCK_SCRIPT, SAVE_AND_RELEASE_SCRIPT):
+            assert "publish" in script
+            assert f'"{LOCK_RELEASE_CHANNEL_SUFFIX}"' in script
+
     @pytest.mark.asyncio
     async def test_lock_with_explicit_session_id(
         self, session_manager: SessionManager, mock_redis: AsyncMock
@@ -323,7 +1281,7 @@ class TestSessionManagerLock:
 
         # Verify the explicit session ID was used
         lock_call = mock_redis.set.call_args_list[0]
-        assert "explicit_lock_id_1234567890123456" in str(lock_call[0][0])
+        assert b"explicit_lock_id_1234567890123456" in lock_call[0][0]
 
 
 class TestSessionManagerDelete:
@@ -364,7 +1322,7 @@ class TestSessionManagerDelete:
 
         assert result is True
         call_args = mock_redis.delete.call_args
-        assert "to_delete_id_1234567890123456" in str(call_args[0][0])
+        assert b"to_delete_id_1234567890123456" in call_args[0][0]
 
 
 class TestSessionManagerExists:
@@ -392,6 +1350,82 @@ class TestSessionManagerExists:
 
         assert result is False
 
+    @pytest.mark.asyncio
+    async def test_exists_always_asks_redis_by_default(
+        self, session_manager: SessionManager, mock_redis: AsyncMock
+    ) -> None:
+        """Test exists() is not cached without exists_cache_ttl."""
+        mock_redis.get.return_value = phpserialize.dumps({"user_id": 1})
+
+        await session_manager.get()
+        await session_manager.exists()
+        await session_manager.exists()
+
+        assert mock_redis.exists.call_count == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("stored", [None, b'a:1:{s:7:"user_id";i:1;}'])
+    async def test_exists_reuses_recent_read(
+        self, mock_redis: AsyncMock, stored: bytes | None
+    ) -> None:
+        """Test exists() answers from a read of the same session within the TTL."""
+        manager = SessionManager(mock_redis, SessionConfig(exists_cache_ttl=60.0))
+        mock_redis.get.return_value = stored
+
+        await manager.get()
+
+        assert await manager.exists() is (stored is not None)
+        mock_redis.exists.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_exists_cache_expires(self, mock_redis: AsyncMock) -> None:
+        """Test cached results are only used within exists_cache_ttl."""
+        manager = SessionManager(mock_redis, SessionConfig(exists_cache_ttl=0.01))
+        mock_redis.exists.return_value = 1
+
+        assert await manager.exists() is True
+        assert await manager.exists() is True
+        await asyncio.sleep(0.02)
+        mock_redis.exists.return_value = 0
+        assert await manager.exists() is False
+
+        assert mock_redis.exists.call_count == 2
+        assert list(manager._exists_cache) == ["a1b2c3d4e5f6g7h8i9j0k1l2m3n4o5p6"]
+
+    @pytest.mark.asyncio
+    async def test_delete_invalidates_exists_cache(
+        self, mock_redis: AsyncMock
+    ) -> None:
+        """Test writes to a session drop its cached existence."""
+        manager = SessionManager(mock_redis, SessionConfig(exists_cache_ttl=60.0))
+        mock_redis.exists.return_value = 1
+        await manager.exists()
+
+        await manager.delete()
+        mock_redis.exists.return_value = 0
+
+        assert await manager.exists() is False
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("write", ["save", "lock"])
+    async def test_writes_invalidate_exists_cache(
+        self, mock_redis: AsyncMock, write: str
+    ) -> None:
+        """Test save() and a lock() block creating the session drop a cached False."""
+        manager = SessionManager(mock_redis, SessionConfig(exists_cache_ttl=60.0))
+        mock_redis.exists.return_value = 0
+        assert await manager.exists() is False
+
+        if write == "save":
+            await manager.save({"user_id": 1})
+        else:
+            async with manager.lock() as session:
+                assert await manager.exists() is False
+                session["user_id"] = 1
+        mock_redis.exists.return_value = 1
+
+        assert await manager.exists() is True
+
 
 class TestDecodeJsonFields:
     """Tests for decode_json_fields helper function."""
@@ -460,6 +1494,94 @@ class TestDecodeJsonFields:
         result = decode_json_fields({})
         assert result == {}
 
+    def test_stdlib_json_fallback(self) -> None:
+        """Test that decoding works with the standard library json module."""
+        data: dict[str, Any] = {"scart_items": "[1, 2]", "ga_data": "not json {"}
+
+        with patch("php_session.decode._json_loads", json.loads):
+            result = decode_json_fields(
+                data,
+                json_fields=frozenset({"scart_items", "ga_data"}),
+            )
+
+        assert result == {"scart_items": [1, 2], "ga_data": "not json {"}
+
+    @pytest.mark.parametrize("json_prefix", ["trace_list_", None])
+    def test_specialized_decoder_matches_decode_json_fields(
+        self, json_prefix: str | None
+    ) -> None:
+        """Test make_json_field_decoder() behaves like decode_json_fields()."""
+        fields = frozenset({"scart_items", "ga_data"})
+        data: dict[str, Any] = {
+            "scart_items": "[1, 2]",
+            "ga_data": "not json {",
+            "trace_list_x": '{"a": 1}',
+            "user_id": 5,
+        }
+        decode = make_json_field_decoder(fields, json_prefix)
+
+        result = decode(dict(data))
+
+        assert result == decode_json_fields(dict(data), fields, json_prefix)
+        assert result["trace_list_x"] == ({"a": 1} if json_prefix else '{"a": 1}')
+
+
+class TestEncodeJsonFields:
+    """Tests for encode_json_fields helper function."""
+
+    def test_encodes_known_and_prefixed_fields(self) -> None:
+        """Test that decoded JSON fields are encoded back to JSON strings."""
+        data: dict[str, Any] = {
+            "scart_items": ["item1", "item2"],
+            "trace_list_products": {"a": 1},
+            "user_id": 123,
+        }
+
+        result = encode_json_fields(data, json_fields=frozenset({"scart_items"}))
+
+        assert result == {
+            "scart_items": '["item1","item2"]',
+            "trace_list_products": '{"a":1}',
+            "user_id": 123,
+        }
+        # The input is not modified
+        assert data["scart_items"] == ["item1", "item2"]
+
+    def test_returns_input_when_nothing_to_encode(self) -> None:
+        """Test that the same dict is returned when no field needs encoding."""
+        data: dict[str, Any] = {"scart_items": "[1]", "user_id": 123}
+
+        result = encode_json_fields(data, json_fields=frozenset({"scart_items"}))
+
+        assert result is data
+
+    def test_encodes_non_ascii_and_big_ints(self) -> None:
+        """Test that values orjson may reject still encode to valid JSON."""
+        data: dict[str, Any] = {"scart_items": {"name": "café", "id": 2**70}}
+
+        result = encode_json_fields(data, json_fields=frozenset({"scart_items"}))
+
+        assert json.loads(result["scart_items"]) == {"name": "café", "id": 2**70}
+
+    def test_int_keys_left_alone(self) -> None:
+        """Test that PHP's int array keys don't break prefix matching."""
+        data: dict[Any, Any] = {0: [1, 2], 1: "[3]", "trace_list_x": [4]}
+
+        decoded = decode_json_fields(dict(data), json_prefix="trace_list_")
+        result = encode_json_fields(data, json_prefix="trace_list_")
+
+        assert decoded == data
+        assert result == {0: [1, 2], 1: "[3]", "trace_list_x": "[4]"}
+
+    def test_round_trips_with_decode(self) -> None:
+        """Test that encoding reverses decode_json_fields."""
+        raw: dict[str, Any] = {"ga_data": '{"event":"click"}', "name": "John"}
+        fields = frozenset({"ga_data"})
+
+        decoded = decode_json_fields(dict(raw), json_fields=fields)
+
+        assert encode_json_fields(decoded, json_fields=fields) == raw
+
 
 class TestPHPCompatibility:
     """Tests for PHP serialization compatibility."""
@@ -494,3 +1616,186 @@ class TestPHPCompatibility:
         # Verify it can be deserialized
         deserialized = phpserialize.loads(serialized, decode_strings=True)
         assert deserialized["cart_count"] == 5
+
+
+class TestLuaScripts:
+    """Run the Lua scripts for real against fakeredis's Lua interpreter.
+
+    The mock_redis fixture only emulates the scripts in Python; these tests
+    catch mistakes in the scripts themselves.
+    """
+
+    SESSION_KEY = b"PHPREDIS_SESSION:a1b2c3d4e5f6g7h8i9j0k1l2m3n4o5p6"
+    LOCK_KEY = SESSION_KEY + b"_LOCK"
+
+    @pytest.fixture
+    def fake_redis(self) -> Any:
+        """Create a fakeredis client with Lua scripting support."""
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        return fakeredis.FakeAsyncRedis()
+
+    @pytest.mark.asyncio
+    async def test_lock_saves_and_releases(self, fake_redis: Any) -> None:
+        """Test the acquire and save + release scripts round trip a session."""
+        await fake_redis.set(self.SESSION_KEY, phpserialize.dumps({"a": 1}))
+        manager = SessionManager(fake_redis, SessionConfig(session_expire=100))
+
+        async with manager.lock() as session:
+            assert session == {"a": 1}
+            assert await fake_redis.exists(self.LOCK_KEY)
+            session["b"] = [1, 2]
+
+        saved = phpserialize.loads(await fake_redis.get(self.SESSION_KEY))
+        assert saved == {b"a": 1, b"b": {0: 1, 1: 2}}
+        assert 0 < await fake_redis.ttl(self.SESSION_KEY) <= 100
+        assert not await fake_redis.exists(self.LOCK_KEY)
+
+    @pytest.mark.asyncio
+    async def test_unchanged_session_only_refreshes_expiry(
+        self, fake_redis: Any
+    ) -> None:
+        """Test the save + release script's EXPIRE-only branch."""
+        raw = phpserialize.dumps({"a": 1})
+        await fake_redis.set(self.SESSION_KEY, raw, ex=10)
+        manager = SessionManager(fake_redis, SessionConfig(session_expire=100))
+
+        async with manager.lock():
+            pass
+
+        assert await fake_redis.get(self.SESSION_KEY) == raw
+        assert await fake_redis.ttl(self.SESSION_KEY) > 10
+
+    @pytest.mark.asyncio
+    async def test_lost_lock_is_not_saved_or_released(self, fake_redis: Any) -> None:
+        """Test nothing is written once another token owns the lock."""
+        manager = SessionManager(fake_redis, SessionConfig())
+
+        async with manager.lock() as session:
+            session["a"] = 1
+            await fake_redis.set(self.LOCK_KEY, b"other-token")
+
+        assert await fake_redis.get(self.SESSION_KEY) is None
+        assert await fake_redis.get(self.LOCK_KEY) == b"other-token"
+
+    @pytest.mark.asyncio
+    async def test_unencodable_session_releases_lock(self, fake_redis: Any) -> None:
+        """Test the plain release script frees the lock when saving fails."""
+        await fake_redis.set(self.SESSION_KEY, phpserialize.dumps({"a": 1}))
+        manager = SessionManager(fake_redis, SessionConfig())
+
+        with pytest.raises(TypeError):
+            async with manager.lock() as session:
+                session["bad"] = object()
+
+        assert not await fake_redis.exists(self.LOCK_KEY)
+        assert await manager.get() == {"a": 1}
+
+    @pytest.mark.asyncio
+    async def test_waiter_wakes_on_release(self, fake_redis: Any) -> None:
+        """Test a contended lock() is woken by the release announcement."""
+        manager = SessionManager(fake_redis, SessionConfig(lock_timeout=5.0))
+        entered = asyncio.Event()
+        order: list[str] = []
+
+        async def holder() -> None:
+            async with manager.lock() as session:
+                entered.set()
+                await asyncio.sleep(0.05)
+                session["count"] = 1
+                order.append("holder")
+
+        async def waiter() -> None:
+            await entered.wait()
+            async with manager.lock() as session:
+                order.append("waiter")
+                session["count"] += 1
+
+        await asyncio.gather(holder(), waiter())
+
+        assert order == ["holder", "waiter"]
+        saved = phpserialize.loads(await fake_redis.get(self.SESSION_KEY))
+        assert saved == {b"count": 2}
+
+    @pytest.mark.asyncio
+    async def test_waiters_fit_in_a_small_connection_pool(self) -> None:
+        """Test many waiters don't each pin a pooled connection while waiting."""
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        pool = BlockingConnectionPool(
+            connection_class=fakeredis.FakeAsyncRedisConnection,
+            server=fakeredis.FakeServer(),
+            max_connections=2,
+            timeout=1,
+        )
+        redis = Redis(connection_pool=pool)
+        manager = SessionManager(redis, SessionConfig(lock_timeout=5.0))
+
+        async def increment() -> None:
+            async with manager.lock() as session:
+                await asyncio.sleep(0.01)
+                session["count"] = session.get("count", 0) + 1
+
+        await asyncio.gather(*(increment() for _ in range(10)))
+
+        assert await manager.get("count") == 10
+        await redis.aclose()
+
+    @pytest.mark.asyncio
+    async def test_listener_removes_two_channels_concurrently(
+        self, fake_redis: Any
+    ) -> None:
+        """Test an in-flight UNSUBSCRIBE isn't cut off by the final close."""
+        listener = _ReleaseListener(fake_redis)
+        first = await listener.add(b"a_LOCK:rel")
+        second = await listener.add(b"b_LOCK:rel")
+
+        await asyncio.gather(
+            listener.remove(b"a_LOCK:rel", first),
+            listener.remove(b"b_LOCK:rel", second),
+        )
+
+        assert listener._waiters == {}
+        assert listener._pubsub is None
+        assert listener._reader is None
+
+    @pytest.mark.asyncio
+    async def test_set_patches_stored_array(self, fake_redis: Any) -> None:
+        """Test the set-key script replaces and appends entries in place."""
+        stored = {"a": 1, "b": {0: "x"}, "c": "keep"}
+        await fake_redis.set(self.SESSION_KEY, phpserialize.dumps(stored))
+        manager = SessionManager(fake_redis, SessionConfig(session_expire=100))
+
+        await manager.set("b", 5)
+        await manager.set("d", None)
+
+        assert await manager.get() == {"a": 1, "b": 5, "c": "keep", "d": None}
+        assert 0 < await fake_redis.ttl(self.SESSION_KEY) <= 100
+
+    @pytest.mark.asyncio
+    async def test_set_rewrites_payload_script_cannot_parse(
+        self, fake_redis: Any
+    ) -> None:
+        """Test set() falls back to a Python rewrite when the script gives up."""
+        # The script rejects the trailing byte; the Python decoder ignores it
+        await fake_redis.set(self.SESSION_KEY, b'a:1:{s:1:"a";i:1;}}')
+        manager = SessionManager(fake_redis, SessionConfig())
+
+        await manager.set("b", 2)
+
+        assert await fake_redis.get(self.SESSION_KEY) == phpserialize.dumps(
+            {"a": 1, "b": 2}
+        )
+
+    @pytest.mark.asyncio
+    async def test_scripts_reload_after_flush(self, fake_redis: Any) -> None:
+        """Test the NOSCRIPT fallback against a real script cache."""
+        manager = SessionManager(fake_redis, SessionConfig())
+        async with manager.lock() as session:
+            session["a"] = 1
+        await fake_redis.script_flush()
+
+        async with manager.lock() as session:
+            session["a"] = 2
+
+        assert await manager.get("a") == 2
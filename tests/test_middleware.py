@@ -2,19 +2,26 @@
 
 from __future__ import annotations
 
-from unittest.mock import AsyncMock, patch
+import logging
+from collections.abc import Iterator
+from typing import Any
 
 import pytest
 from starlette.requests import Request
 from starlette.responses import Response
+from starlette.types import Message, Receive, Scope, Send
 
-from php_session import get_current_session_id, set_current_session_id
+from php_session import (
+    bind_session_id,
+    get_current_session_id,
+    set_current_session_id,
+)
 from php_session.contrib.starlette import PHPSessionMiddleware
 
 
-def create_mock_request(cookies: dict[str, str] | None = None) -> Request:
-    """Create a mock Starlette Request with optional cookies."""
-    scope: dict[str, object] = {
+def create_scope(cookies: dict[str, str] | None = None) -> Scope:
+    """Create an HTTP ASGI scope with optional cookies."""
+    scope: Scope = {
         "type": "http",
         "method": "GET",
         "path": "/test",
@@ -26,183 +33,265 @@ def create_mock_request(cookies: dict[str, str] | None = None) -> Request:
         cookie_header = "; ".join(f"{k}={v}" for k, v in cookies.items())
         scope["headers"] = [(b"cookie", cookie_header.encode())]
 
-    return Request(scope)
+    return scope
 
 
-async def dummy_call_next(request: Request) -> Response:
-    """Dummy call_next function that returns a simple response."""
-    return Response(content="OK", status_code=200)
+async def receive() -> dict[str, Any]:
+    """ASGI receive callable returning an empty request body."""
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+class CapturingApp:
+    """ASGI app that records the session context it was called with."""
+
+    def __init__(self) -> None:
+        self.called = False
+        self.session_id: str | None = "not_called"
+        self.request: Request | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.called = True
+        self.session_id = get_current_session_id()
+        self.request = Request(scope)
+        await Response(content="OK", status_code=200)(scope, receive, send)
+
+
+async def run(
+    middleware: PHPSessionMiddleware, scope: Scope
+) -> list[Message]:
+    """Run a request through the middleware and return the sent messages."""
+    messages: list[Message] = []
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    return messages
 
 
 class TestPHPSessionMiddleware:
     """Tests for PHPSessionMiddleware class."""
 
     @pytest.fixture(autouse=True)
-    def reset_context(self) -> None:
-        """Reset context variables before each test."""
-        set_current_session_id(None)
+    def reset_context(self) -> Iterator[None]:
+        """Run each test without a session_id, restoring the previous one after."""
+        with bind_session_id(None):
+            yield
 
     @pytest.mark.asyncio
     async def test_sets_session_id_from_cookie(self) -> None:
         """Test middleware sets session_id when PHPSESSID cookie is present."""
-        middleware = PHPSessionMiddleware(app=AsyncMock())
+        app = CapturingApp()
+        middleware = PHPSessionMiddleware(app=app)
         session_id = "a1b2c3d4e5f6g7h8i9j0k1l2m3n4o5p6"
-        request = create_mock_request(cookies={"PHPSESSID": session_id})
-
-        captured_session_id: str | None = None
 
-        async def capturing_call_next(req: Request) -> Response:
-            nonlocal captured_session_id
-            captured_session_id = get_current_session_id()
-            return Response(content="OK", status_code=200)
+        await run(middleware, create_scope(cookies={"PHPSESSID": session_id}))
 
-        await middleware.dispatch(request, capturing_call_next)
-
-        assert captured_session_id == session_id
+        assert app.session_id == session_id
 
     @pytest.mark.asyncio
     async def test_sets_request_state_session_id(self) -> None:
         """Test middleware sets request.state.session_id."""
-        middleware = PHPSessionMiddleware(app=AsyncMock())
+        app = CapturingApp()
+        middleware = PHPSessionMiddleware(app=app)
         session_id = "b2c3d4e5f6g7h8i9j0k1l2m3n4o5p6q7"
-        request = create_mock_request(cookies={"PHPSESSID": session_id})
-
-        captured_state_session_id: str | None = None
 
-        async def capturing_call_next(req: Request) -> Response:
-            nonlocal captured_state_session_id
-            captured_state_session_id = getattr(req.state, "session_id", None)
-            return Response(content="OK", status_code=200)
+        await run(middleware, create_scope(cookies={"PHPSESSID": session_id}))
 
-        await middleware.dispatch(request, capturing_call_next)
-
-        assert captured_state_session_id == session_id
+        assert app.request is not None
+        assert app.request.state.session_id == session_id
 
     @pytest.mark.asyncio
     async def test_clears_context_after_request(self) -> None:
         """Test middleware clears context variable after request completes."""
-        middleware = PHPSessionMiddleware(app=AsyncMock())
-        request = create_mock_request(cookies={"PHPSESSID": "c3d4e5f6g7h8i9j0k1l2m3n4o5p6q7r8"})
+        middleware = PHPSessionMiddleware(app=CapturingApp())
+        scope = create_scope(cookies={"PHPSESSID": "c3d4e5f6g7h8i9j0k1l2m3n4o5p6q7r8"})
 
-        await middleware.dispatch(request, dummy_call_next)
+        await run(middleware, scope)
 
         assert get_current_session_id() is None
 
+    @pytest.mark.asyncio
+    async def test_restores_outer_context_after_request(self) -> None:
+        """Test middleware restores, rather than clears, an outer session_id."""
+        outer_id = "z9y8x7w6v5u4t3s2r1q0p9o8n7m6l5k4"
+        set_current_session_id(outer_id)
+        app = CapturingApp()
+        middleware = PHPSessionMiddleware(app=app)
+        scope = create_scope(cookies={"PHPSESSID": "c3d4e5f6g7h8i9j0k1l2m3n4o5p6q7r8"})
+
+        await run(middleware, scope)
+
+        assert app.session_id == "c3d4e5f6g7h8i9j0k1l2m3n4o5p6q7r8"
+        assert get_current_session_id() == outer_id
+
+    @pytest.mark.asyncio
+    async def test_no_cookie_hides_outer_context(self) -> None:
+        """Test a cookie-less request doesn't see an outer session_id."""
+        outer_id = "z9y8x7w6v5u4t3s2r1q0p9o8n7m6l5k4"
+        set_current_session_id(outer_id)
+        app = CapturingApp()
+        middleware = PHPSessionMiddleware(app=app)
+
+        await run(middleware, create_scope())
+
+        assert app.session_id is None
+        assert get_current_session_id() == outer_id
+
     @pytest.mark.asyncio
     async def test_clears_context_on_exception(self) -> None:
         """Test middleware clears context even when exception occurs."""
-        middleware = PHPSessionMiddleware(app=AsyncMock())
-        request = create_mock_request(cookies={"PHPSESSID": "d4e5f6g7h8i9j0k1l2m3n4o5p6q7r8s9"})
 
-        async def raising_call_next(req: Request) -> Response:
+        async def raising_app(_scope: Scope, _receive: Receive, _send: Send) -> None:
             raise ValueError("Test exception")
 
+        middleware = PHPSessionMiddleware(app=raising_app)
+        scope = create_scope(cookies={"PHPSESSID": "d4e5f6g7h8i9j0k1l2m3n4o5p6q7r8s9"})
+
         with pytest.raises(ValueError, match="Test exception"):
-            await middleware.dispatch(request, raising_call_next)
+            await run(middleware, scope)
 
         assert get_current_session_id() is None
 
     @pytest.mark.asyncio
     async def test_no_cookie_skips_context_setup(self) -> None:
         """Test middleware skips context setup when no PHPSESSID cookie."""
-        middleware = PHPSessionMiddleware(app=AsyncMock())
-        request = create_mock_request(cookies={})
-
-        captured_session_id: str | None = "should_be_none"
+        app = CapturingApp()
+        middleware = PHPSessionMiddleware(app=app)
 
-        async def capturing_call_next(req: Request) -> Response:
-            nonlocal captured_session_id
-            captured_session_id = get_current_session_id()
-            return Response(content="OK", status_code=200)
+        await run(middleware, create_scope(cookies={}))
 
-        await middleware.dispatch(request, capturing_call_next)
-
-        assert captured_session_id is None
+        assert app.session_id is None
 
     @pytest.mark.asyncio
-    async def test_no_request_state_when_no_cookie(self) -> None:
-        """Test middleware doesn't set request.state.session_id when no cookie."""
-        middleware = PHPSessionMiddleware(app=AsyncMock())
-        request = create_mock_request(cookies={})
-
-        has_session_id_attr = True
-
-        async def capturing_call_next(req: Request) -> Response:
-            nonlocal has_session_id_attr
-            has_session_id_attr = hasattr(req.state, "session_id")
-            return Response(content="OK", status_code=200)
+    async def test_request_state_is_none_when_no_cookie(self) -> None:
+        """Test request.state.session_id is None when there is no cookie."""
+        app = CapturingApp()
+        middleware = PHPSessionMiddleware(app=app)
 
-        await middleware.dispatch(request, capturing_call_next)
+        await run(middleware, create_scope(cookies={}))
 
-        assert has_session_id_attr is False
+        assert app.request is not None
+        assert app.request.state.session_id is None
 
     @pytest.mark.asyncio
     async def test_other_cookies_ignored(self) -> None:
         """Test middleware ignores other cookies, only reads PHPSESSID."""
-        middleware = PHPSessionMiddleware(app=AsyncMock())
-        request = create_mock_request(
-            cookies={"other_cookie": "value", "session": "wrong"}
-        )
-
-        captured_session_id: str | None = "should_be_none"
-
-        async def capturing_call_next(req: Request) -> Response:
-            nonlocal captured_session_id
-            captured_session_id = get_current_session_id()
-            return Response(content="OK", status_code=200)
+        app = CapturingApp()
+        middleware = PHPSessionMiddleware(app=app)
 
-        await middleware.dispatch(request, capturing_call_next)
+        await run(
+            middleware,
+            create_scope(cookies={"other_cookie": "value", "session": "wrong"}),
+        )
 
-        assert captured_session_id is None
+        assert app.session_id is None
 
     @pytest.mark.asyncio
-    async def test_returns_response_from_call_next(self) -> None:
-        """Test middleware returns the response from call_next."""
-        middleware = PHPSessionMiddleware(app=AsyncMock())
-        request = create_mock_request(cookies={"PHPSESSID": "f6g7h8i9j0k1l2m3n4o5p6q7r8s9t0u1"})
+    async def test_passes_response_through(self) -> None:
+        """Test middleware forwards the app's response messages unchanged."""
+
+        async def custom_app(scope: Scope, receive: Receive, send: Send) -> None:
+            response = Response(content="Custom Response", status_code=201)
+            await response(scope, receive, send)
 
-        async def custom_call_next(req: Request) -> Response:
-            return Response(content="Custom Response", status_code=201)
+        middleware = PHPSessionMiddleware(app=custom_app)
+        scope = create_scope(cookies={"PHPSESSID": "f6g7h8i9j0k1l2m3n4o5p6q7r8s9t0u1"})
 
-        response = await middleware.dispatch(request, custom_call_next)
+        messages = await run(middleware, scope)
 
-        assert response.status_code == 201
-        assert response.body == b"Custom Response"
+        assert messages[0]["type"] == "http.response.start"
+        assert messages[0]["status"] == 201
+        assert messages[1]["body"] == b"Custom Response"
 
     @pytest.mark.asyncio
     async def test_custom_cookie_name(self) -> None:
         """Test middleware can use custom cookie name."""
-        middleware = PHPSessionMiddleware(app=AsyncMock(), cookie_name="MY_SESSION")
-        request = create_mock_request(cookies={"MY_SESSION": "e5f6g7h8i9j0k1l2m3n4o5p6q7r8s9t0"})
-
-        captured_session_id: str | None = None
+        app = CapturingApp()
+        middleware = PHPSessionMiddleware(app=app, cookie_name="MY_SESSION")
 
-        async def capturing_call_next(req: Request) -> Response:
-            nonlocal captured_session_id
-            captured_session_id = get_current_session_id()
-            return Response(content="OK", status_code=200)
-
-        await middleware.dispatch(request, capturing_call_next)
+        await run(
+            middleware,
+            create_scope(cookies={"MY_SESSION": "e5f6g7h8i9j0k1l2m3n4o5p6q7r8s9t0"}),
+        )
 
-        assert captured_session_id == "e5f6g7h8i9j0k1l2m3n4o5p6q7r8s9t0"
+        assert app.session_id == "e5f6g7h8i9j0k1l2m3n4o5p6q7r8s9t0"
 
     @pytest.mark.asyncio
     async def test_rejects_invalid_session_id(self) -> None:
         """Test middleware rejects invalid session IDs."""
-        middleware = PHPSessionMiddleware(app=AsyncMock())
+        app = CapturingApp()
+        middleware = PHPSessionMiddleware(app=app)
         # Invalid: contains special characters
-        request = create_mock_request(cookies={"PHPSESSID": "invalid<script>alert(1)</script>"})
+        scope = create_scope(cookies={"PHPSESSID": "invalid<script>alert(1)</script>"})
+
+        await run(middleware, scope)
+
+        assert app.session_id is None
+
+    @pytest.mark.asyncio
+    async def test_rejected_session_id_is_logged(
+        self, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        """Test malformed session IDs still reach the rejection warning."""
+        app = CapturingApp()
+        middleware = PHPSessionMiddleware(
+            app=app, logger=logging.getLogger("test.middleware")
+        )
+        scope = create_scope(cookies={"PHPSESSID": "too_short"})
+
+        with caplog.at_level(logging.WARNING, logger="test.middleware"):
+            await run(middleware, scope)
+
+        assert app.session_id is None
+        assert "Invalid PHPSESSID format rejected" in caplog.text
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("header", "expected"),
+        [
+            (b"PHPSESSID=" + b"a" * 32, "a" * 32),
+            (b"foo=bar;PHPSESSID=" + b"b" * 32 + b";baz=1", "b" * 32),
+            (b"foo=bar;  PHPSESSID=" + b"c" * 32 + b" ; baz=1", "c" * 32),
+            (b"PHPSESSID=" + b"d" * 32 + b"; PHPSESSID=" + b"e" * 32, "d" * 32),
+            (b"XPHPSESSID=" + b"f" * 32, None),
+            (b"PHPSESSID=" + b"g" * 129, None),
+            (b"PHPSESSID=" + b"h" * 32 + b"!", None),
+            (b"x=PHPSESSID=" + b"i" * 32, None),
+            (b"x=1;\tPHPSESSID=" + b"j" * 32, "j" * 32),
+            (b"PHPSESSID=bad; PHPSESSID=" + b"k" * 32, "k" * 32),
+            (b'PHPSESSID="' + b"l" * 32 + b'"', "l" * 32),
+            (b'PHPSESSID="' + b"m" * 32, None),
+        ],
+    )
+    async def test_cookie_header_parsing(
+        self, header: bytes, expected: str | None
+    ) -> None:
+        """Test session ID extraction from raw Cookie header values."""
+        app = CapturingApp()
+        middleware = PHPSessionMiddleware(app=app)
+        scope = create_scope()
+        scope["headers"] = [(b"cookie", header)]
+
+        await run(middleware, scope)
+
+        assert app.session_id == expected
+
+    @pytest.mark.asyncio
+    async def test_non_http_scope_passed_through(self) -> None:
+        """Test middleware leaves lifespan and websocket scopes untouched."""
+        seen: list[Scope] = []
 
-        captured_session_id: str | None = "should_be_none"
+        async def lifespan_app(scope: Scope, _receive: Receive, _send: Send) -> None:
+            seen.append(scope)
 
-        async def capturing_call_next(req: Request) -> Response:
-            nonlocal captured_session_id
-            captured_session_id = get_current_session_id()
-            return Response(content="OK", status_code=200)
+        middleware = PHPSessionMiddleware(app=lifespan_app)
+        scope: Scope = {"type": "lifespan"}
 
-        await middleware.dispatch(request, capturing_call_next)
+        await run(middleware, scope)
 
-        assert captured_session_id is None
+        assert seen == [scope]
+        assert "state" not in scope
 
 
 class TestPHPSessionMiddlewareIntegration:
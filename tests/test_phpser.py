@@ -0,0 +1,210 @@
+"""Tests for the PHP (un)serializer used for session payloads."""
+
+from __future__ import annotations
+
+import enum
+from collections import OrderedDict
+from typing import Any
+
+import phpserialize
+import pytest
+
+from php_session._phpser import dumps, dumps_key, loads, loads_item
+
+
+class TestLoads:
+    """Tests for _phpser.loads()."""
+
+    @pytest.mark.parametrize(
+        ("raw", "expected"),
+        [
+            (b"N;", None),
+            (b"b:1;", True),
+            (b"b:0;", False),
+            (b"i:42;", 42),
+            (b"i:-7;", -7),
+            (b"d:1.5;", 1.5),
+            (b"d:-0.25;", -0.25),
+            (b's:5:"hello";', "hello"),
+            (b's:0:"";', ""),
+            (b'a:0:{}', {}),
+        ],
+    )
+    def test_scalars(self, raw: bytes, expected: Any) -> None:
+        """Test that scalar values are unserialized."""
+        assert loads(raw) == expected
+
+    def test_string_with_delimiters(self) -> None:
+        """Test that strings are read by length, not by delimiters."""
+        value = 'a";s:1:"b";}'
+        raw = phpserialize.dumps({"k": value})
+
+        assert loads(raw) == {"k": value}
+
+    def test_multibyte_string(self) -> None:
+        """Test that string lengths are byte lengths and decoded as UTF-8."""
+        raw = 's:5:"café";'.encode()
+
+        assert loads(raw) == "café"
+        assert loads(raw, decode_strings=False) == "café".encode()
+
+    def test_nested_arrays_and_int_keys(self) -> None:
+        """Test nested arrays, including PHP lists with integer keys."""
+        raw = b'a:2:{s:4:"cart";a:2:{i:0;i:10;i:1;i:20;}s:4:"user";a:1:{s:2:"id";i:5;}}'
+
+        assert loads(raw) == {"cart": {0: 10, 1: 20}, "user": {"id": 5}}
+
+    def test_object_becomes_dict(self) -> None:
+        """Test that PHP objects are read as dicts of their properties."""
+        raw = b'O:8:"stdClass":2:{s:1:"a";i:1;s:1:"b";N;}'
+
+        assert loads(raw) == {"a": 1, "b": None}
+
+    def test_matches_phpserialize(self) -> None:
+        """Test that output matches phpserialize for a realistic session."""
+        session: dict[str, Any] = {
+            "user_id": 123,
+            "name": "John",
+            "ratio": 0.5,
+            "active": True,
+            "missing": None,
+            "scart_items": '[{"id":1,"qty":2}]',
+            "nested": {"a": [1, 2, {"b": "c"}], "d": {}},
+        }
+        raw = phpserialize.dumps(session)
+
+        expected = phpserialize.loads(
+            raw, decode_strings=True, object_hook=lambda _name, d: dict(d)
+        )
+        assert loads(raw) == expected
+
+    @pytest.mark.parametrize(
+        "raw",
+        [
+            b"",
+            b"x:1;",
+            b's:10:"short";',
+            b'a:1:{s:1:"a";i:1;',
+            b"a:1:{i:0;i:1;]",
+            b"i:12",
+        ],
+    )
+    def test_malformed_input_raises_value_error(self, raw: bytes) -> None:
+        """Test that malformed input raises ValueError."""
+        with pytest.raises(ValueError):
+            loads(raw)
+
+
+class TestLoadsItem:
+    """Tests for _phpser.loads_item()."""
+
+    RAW = phpserialize.dumps(
+        {
+            "user": {"id": 5, "tags": ['}";']},
+            7: 0.5,
+            "obj": phpserialize.phpobject("stdClass", {"a": True}),
+            "name": "café",
+            "none": None,
+        }
+    )
+
+    @pytest.mark.parametrize("key", ["user", 7, "obj", "name", "none"])
+    def test_matches_full_loads(self, key: Any) -> None:
+        """Test that each entry equals the one from a full loads()."""
+        assert loads_item(self.RAW, key) == loads(self.RAW)[key]
+
+    def test_missing_key_returns_none(self) -> None:
+        """Test that a key that is not present returns None."""
+        assert loads_item(self.RAW, "missing") is None
+        assert loads_item(b"a:0:{}", "missing") is None
+
+    def test_keys_match_as_serialized(self) -> None:
+        """Test that string and int keys are not interchangeable."""
+        assert loads_item(self.RAW, "7") is None
+
+    @pytest.mark.parametrize(
+        "raw",
+        [
+            b"",
+            b"i:1;",
+            b'a:2:{s:1:"a";i:1;}',
+            b'a:1:{s:1:"a";s:10:"short";}',
+            b'a:1:{s:1:"a";x:1;}',
+            b'a:1:{s:1:"a";O:3:"Foo:0:{}}',
+        ],
+    )
+    def test_malformed_input_raises_value_error(self, raw: bytes) -> None:
+        """Test that malformed arrays raise ValueError."""
+        with pytest.raises(ValueError):
+            loads_item(raw, "missing")
+
+
+class TestDumps:
+    """Tests for _phpser.dumps()."""
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            None,
+            True,
+            False,
+            0,
+            -7,
+            2**70,
+            1.5,
+            0.1,
+            1e16,
+            "",
+            "café",
+            b"\x00\xff",
+            [1, "a", [2]],
+            (1, 2),
+            {},
+            {"a": {"b": [1, 2.5, None]}, 1: 2, False: 3, None: 4, b"k": 1, 2.7: 5},
+        ],
+    )
+    def test_matches_phpserialize(self, value: Any) -> None:
+        """Test that output is byte-identical to phpserialize.dumps()."""
+        assert dumps(value) == phpserialize.dumps(value)
+
+    def test_subclasses_match_phpserialize(self) -> None:
+        """Test that subclasses of supported types serialize like their base."""
+
+        class Level(enum.IntEnum):
+            HIGH = 3
+
+        class Name(str):
+            pass
+
+        value = OrderedDict(
+            [("level", Level.HIGH), ("name", Name("café")), (Name("k"), [True])]
+        )
+
+        assert dumps(value) == phpserialize.dumps(value)
+
+    def test_php_object_falls_back_to_phpserialize(self) -> None:
+        """Test that phpserialize.phpobject values are still serialized."""
+        value = {"obj": phpserialize.phpobject("Foo", {"a": 1})}
+
+        assert dumps(value) == phpserialize.dumps(value)
+
+    @pytest.mark.parametrize("key", ["cart", "", 5, True, 2.7, None, b"k"])
+    def test_dumps_key_matches_array_entry(self, key: Any) -> None:
+        """Test that dumps_key() gives the key bytes dumps() writes in arrays."""
+        assert dumps({key: 1}) == b"a:1:{" + dumps_key(key) + b"i:1;}"
+
+    def test_round_trip(self) -> None:
+        """Test that loads() reads back what dumps() writes."""
+        session: dict[str, Any] = {
+            "user_id": 123,
+            "name": "Jöhn",
+            "nested": {"a": {0: 1, 1: {"b": "c"}}},
+        }
+
+        assert loads(dumps(session)) == session
+
+    @pytest.mark.parametrize("value", [object(), {"k": object()}, {(1, 2): 1}])
+    def test_unsupported_types_raise_type_error(self, value: Any) -> None:
+        """Test that values PHP cannot represent raise TypeError."""
+        with pytest.raises(TypeError):
+            dumps(value)
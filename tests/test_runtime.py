@@ -0,0 +1,46 @@
+"""Tests for event loop setup helpers."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import types
+from collections.abc import Coroutine
+from typing import Any
+
+import pytest
+
+from php_session import run_with_uvloop
+
+
+async def current_loop() -> asyncio.AbstractEventLoop:
+    """Return the loop the coroutine runs on."""
+    return asyncio.get_running_loop()
+
+
+class TestRunWithUvloop:
+    """Tests for run_with_uvloop()."""
+
+    def test_runs_on_uvloop(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the coroutine is handed to uvloop.run() when available."""
+        ran: list[Coroutine[Any, Any, Any]] = []
+
+        def run(main: Coroutine[Any, Any, Any]) -> Any:
+            ran.append(main)
+            return asyncio.run(main)
+
+        uvloop = types.ModuleType("uvloop")
+        uvloop.run = run  # type: ignore[attr-defined]
+        monkeypatch.setitem(sys.modules, "uvloop", uvloop)
+        main = current_loop()
+
+        assert isinstance(run_with_uvloop(main), asyncio.AbstractEventLoop)
+        assert ran == [main]
+
+    def test_falls_back_to_asyncio_run(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test asyncio.run() is used when uvloop is not installed."""
+        monkeypatch.setitem(sys.modules, "uvloop", None)
+        policy = asyncio.get_event_loop_policy()
+
+        assert isinstance(run_with_uvloop(current_loop()), asyncio.AbstractEventLoop)
+        assert asyncio.get_event_loop_policy() is policy
@@ -6,7 +6,7 @@ import logging
 
 import pytest
 
-from php_session import sanitize_phpsessid
+from php_session import PHPSESSID_PATTERN, sanitize_phpsessid
 
 
 class TestPHPSESSIDSanitization:
@@ -148,3 +148,20 @@ class TestPHPSESSIDSanitization:
         # Also test with valid ID (shouldn't log warning)
         valid_result = sanitize_phpsessid("a" * 32, logger=logger)
         assert valid_result == "a" * 32
+
+    @pytest.mark.parametrize(
+        "session_id",
+        [
+            "a" * 32,
+            "Z9" * 13,
+            "a" * 31 + "\u0661",  # Arabic-Indic digit: isalnum() but not ASCII
+            "a" * 31 + "\u00df",  # sharp s: isalnum() but not ASCII
+            "a" * 31 + "_",
+            "a" * 31 + "\x00",
+            "\uff41" * 32,  # fullwidth letters
+        ],
+    )
+    def test_agrees_with_phpsessid_pattern(self, session_id: str) -> None:
+        """The fast path accepts exactly what PHPSESSID_PATTERN accepts."""
+        expected = session_id if PHPSESSID_PATTERN.match(session_id) else None
+        assert sanitize_phpsessid(session_id) == expected
@@ -0,0 +1,132 @@
+"""Tests for session payload serializers."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import phpserialize
+import pytest
+
+from php_session import MsgPackSerializer, PHPSerializer, SessionConfig, ZstdSerializer
+from php_session import serializer as serializer_module
+
+SESSION: dict[str, Any] = {
+    "user_id": 123,
+    "name": "Jöhn",
+    "ratio": 0.5,
+    "active": True,
+    "missing": None,
+    "scart_items": '[{"id":1}]',
+    "cart": {0: "a", 1: "b"},
+}
+
+
+class TestPHPSerializer:
+    """Tests for PHPSerializer."""
+
+    def test_is_default(self) -> None:
+        """Test SessionConfig uses PHP serialization by default."""
+        assert SessionConfig().serializer == PHPSerializer()
+
+    def test_round_trip_is_php_compatible(self) -> None:
+        """Test payloads are PHP-serialized and read back unchanged."""
+        serializer = PHPSerializer()
+
+        raw = serializer.dumps(SESSION)
+
+        assert raw == phpserialize.dumps(SESSION)
+        assert serializer.loads(raw) == SESSION
+
+
+class TestMsgPackSerializer:
+    """Tests for MsgPackSerializer."""
+
+    @pytest.fixture(autouse=True)
+    def require_msgpack(self) -> None:
+        """Skip when the optional msgpack dependency is missing."""
+        pytest.importorskip("msgpack")
+
+    def test_round_trip(self) -> None:
+        """Test session data survives a msgpack round trip, int keys included."""
+        serializer = MsgPackSerializer()
+
+        raw = serializer.dumps(SESSION)
+
+        assert raw[:2] != b"a:"
+        assert serializer.loads(raw) == SESSION
+
+    def test_reads_php_serialized_sessions(self) -> None:
+        """Test legacy PHP-serialized payloads are still readable."""
+        raw = phpserialize.dumps(SESSION)
+
+        assert MsgPackSerializer().loads(raw) == SESSION
+
+    @pytest.mark.parametrize("raw", [b"", b"\x81\xa1a", b"\x81\xa1\xff\x01"])
+    def test_invalid_payload_raises_value_error(self, raw: bytes) -> None:
+        """Test undecodable payloads raise ValueError."""
+        with pytest.raises(ValueError):
+            MsgPackSerializer().loads(raw)
+
+    def test_requires_msgpack(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a helpful ImportError when msgpack is not installed."""
+        monkeypatch.setattr(serializer_module, "msgpack", None)
+
+        with pytest.raises(ImportError, match=r"py-php-session\[msgpack\]"):
+            MsgPackSerializer()
+
+
+class TestZstdSerializer:
+    """Tests for ZstdSerializer."""
+
+    @pytest.fixture(autouse=True)
+    def require_zstandard(self) -> None:
+        """Skip when the optional zstandard dependency is missing."""
+        pytest.importorskip("zstandard")
+
+    def test_small_payload_stored_uncompressed(self) -> None:
+        """Test payloads up to the threshold are left as they are."""
+        raw = ZstdSerializer(threshold=1024).dumps(SESSION)
+
+        assert raw == phpserialize.dumps(SESSION)
+
+    def test_large_payload_is_plain_zstd_frame(self) -> None:
+        """Test large payloads are zstd frames of the inner payload."""
+        import zstandard
+
+        data = {"trace_list_views": "x" * 2000}
+        raw = ZstdSerializer(threshold=512).dumps(data)
+
+        assert raw[:4] == b"\x28\xb5\x2f\xfd"
+        assert len(raw) < 512
+        assert zstandard.ZstdDecompressor().decompress(raw) == phpserialize.dumps(data)
+        assert ZstdSerializer().loads(raw) == data
+
+    def test_wraps_other_serializers(self) -> None:
+        """Test compressed and uncompressed payloads of the inner format."""
+        pytest.importorskip("msgpack")
+        serializer = ZstdSerializer(MsgPackSerializer(), threshold=0)
+
+        assert serializer.loads(serializer.dumps(SESSION)) == SESSION
+        assert serializer.loads(MsgPackSerializer().dumps(SESSION)) == SESSION
+
+    def test_corrupt_frame_raises_value_error(self) -> None:
+        """Test undecompressable payloads raise ValueError."""
+        with pytest.raises(ValueError, match="invalid zstd payload"):
+            ZstdSerializer().loads(b"\x28\xb5\x2f\xfd\x00\x01")
+
+    def test_negative_threshold_rejected(self) -> None:
+        """Test a negative threshold raises ValueError."""
+        with pytest.raises(ValueError, match="threshold cannot be negative"):
+            ZstdSerializer(threshold=-1)
+
+    def test_equal_configs_compare_equal(self) -> None:
+        """Test instances compare by settings, not by their codecs."""
+        assert ZstdSerializer(level=5) == ZstdSerializer(level=5)
+        assert ZstdSerializer(level=5) != ZstdSerializer(level=1)
+
+    def test_requires_zstandard(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a helpful ImportError when zstandard is not installed."""
+        monkeypatch.setattr(serializer_module, "zstandard", None)
+
+        with pytest.raises(ImportError, match=r"py-php-session\[zstd\]"):
+            ZstdSerializer()